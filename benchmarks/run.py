@@ -0,0 +1,215 @@
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from paykassa.dto import CheckBalanceRequest, CheckBalanceResponse, CheckPaymentRequest, CheckPaymentResponse, \
+    CheckTransactionRequest, CheckTransactionResponse, GenerateAddressRequest, GenerateAddressResponse, \
+    GetPaymentUrlRequest, GetPaymentUrlResponse, GetTxidsOfInvoicesRequest, GetTxidsOfInvoicesResponse, \
+    MakePaymentRequest, MakePaymentResponse
+from paykassa.merchant import MerchantApi
+from paykassa.payment import PaymentApi
+from paykassa.struct import System, Currency, CommissionPayer, TransactionPriority
+from paykassa.transport import Transport
+
+from benchmarks.server import StandInServer, RESPONSES
+
+PRIVATE_HASH = "ba276492c1c8ff5bfad7ea46463aca85d9c447ee940aceeb71e4a726d89458cd"
+
+
+def get_requests() -> dict:
+    return {
+        "check_payment": lambda: CheckPaymentRequest()
+            .set_private_hash(PRIVATE_HASH),
+        "check_transaction": lambda: CheckTransactionRequest()
+            .set_private_hash(PRIVATE_HASH),
+        "generate_address": lambda: GenerateAddressRequest()
+            .set_order_id("12345")
+            .set_amount("1.01")
+            .set_currency(Currency.BTC)
+            .set_system(System.BITCOIN)
+            .set_paid_commission(CommissionPayer.SHOP)
+            .set_comment("benchmark"),
+        "get_payment_url": lambda: GetPaymentUrlRequest()
+            .set_order_id("12345")
+            .set_amount("1.01")
+            .set_currency(Currency.BTC)
+            .set_system(System.BITCOIN)
+            .set_paid_commission(CommissionPayer.SHOP)
+            .set_comment("benchmark"),
+        "check_balance": lambda: CheckBalanceRequest()
+            .set_shop_id("123"),
+        "make_payment": lambda: MakePaymentRequest()
+            .set_shop_id("123")
+            .set_amount("1.01")
+            .set_currency(Currency.BTC)
+            .set_system(System.BITCOIN)
+            .set_paid_commission(CommissionPayer.SHOP)
+            .set_number("3LaKdUrPfVyZeEVYpZei3HwjqQj5AHHTCE")
+            .set_priority(TransactionPriority.MEDIUM),
+        "get_txids_by_invoices": lambda: GetTxidsOfInvoicesRequest()
+            .set_shop_id("123")
+            .set_invoices(["1", "2", "3", "4", "5"]),
+    }
+
+
+def get_responses() -> dict:
+    def ok(func: str) -> dict:
+        return {"error": False, "message": "Ok", "data": RESPONSES[func]}
+
+    return {
+        "CheckPaymentResponse": (CheckPaymentResponse, ok("sci_confirm_order")),
+        "CheckTransactionResponse": (CheckTransactionResponse, ok("sci_confirm_transaction_notification")),
+        "GenerateAddressResponse": (GenerateAddressResponse, ok("sci_create_order_get_data")),
+        "GetPaymentUrlResponse": (GetPaymentUrlResponse, ok("sci_create_order")),
+        "CheckBalanceResponse": (CheckBalanceResponse, ok("api_get_shop_balance")),
+        "MakePaymentResponse": (MakePaymentResponse, ok("api_payment")),
+        "GetTxidsOfInvoicesResponse": (GetTxidsOfInvoicesResponse, {
+            "error": False, "message": "Ok", "data": {str(i): [str(i) * 4] for i in range(1, 6)},
+        }),
+    }
+
+
+def get_clients(url: str, transport: Transport) -> tuple:
+    class StandInMerchantApi(MerchantApi):
+        BASE_URL = url + "sci/"
+
+    class StandInPaymentApi(PaymentApi):
+        BASE_URL = url + "api/"
+
+    return StandInMerchantApi("123", "secret", transport), StandInPaymentApi(123, "secret", transport)
+
+
+def get_calls(merchant: MerchantApi, payment: PaymentApi) -> dict:
+    requests = get_requests()
+
+    return {name: (getattr(merchant, name) if hasattr(merchant, name) else getattr(payment, name), requests[name])
+            for name in requests}
+
+
+def get_percentiles(samples: list) -> dict:
+    samples = sorted(samples)
+
+    def at(percentile: float) -> float:
+        return samples[min(len(samples) - 1, int(len(samples) * percentile / 100))]
+
+    return {
+        "min": samples[0],
+        "mean": statistics.mean(samples),
+        "p50": at(50),
+        "p95": at(95),
+        "p99": at(99),
+        "max": samples[-1],
+    }
+
+
+def measure_latency(call, make_request, iterations: int) -> dict:
+    samples = []
+    for _ in range(iterations):
+        request = make_request()
+        started = time.perf_counter()
+        response = call(request)
+        samples.append(time.perf_counter() - started)
+
+        if response.has_error():
+            raise RuntimeError(response.get_message())
+
+    return get_percentiles(samples)
+
+
+def measure_throughput(call, make_request, concurrency: int, iterations: int) -> dict:
+    def worker(count: int):
+        for _ in range(count):
+            call(make_request())
+
+    counts = [iterations // concurrency + (1 if i < iterations % concurrency else 0) for i in range(concurrency)]
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        started = time.perf_counter()
+        for future in [executor.submit(worker, count) for count in counts]:
+            future.result()
+        elapsed = time.perf_counter() - started
+
+    return {"concurrency": concurrency, "calls": iterations, "seconds": elapsed, "calls_per_second": iterations / elapsed}
+
+
+def measure_memory(call, make_request, iterations: int) -> dict:
+    call(make_request())
+    gc.collect()
+
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        responses = [call(make_request()) for _ in range(iterations)]
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    del responses
+    return {
+        "retained_bytes_per_call": (retained - before) / iterations,
+        "peak_bytes": peak - before,
+    }
+
+
+def measure_micro(fn, iterations: int) -> dict:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - started
+
+    return {"iterations": iterations, "ns_per_op": elapsed / iterations * 1e9}
+
+
+def run(iterations: int, concurrency: list, micro_iterations: int) -> dict:
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "methods": {},
+        "normalize": {},
+        "response": {},
+    }
+
+    with StandInServer() as server, Transport(pool_maxsize=max(concurrency)) as transport:
+        merchant, payment = get_clients(server.get_url(), transport)
+
+        for name, (call, make_request) in get_calls(merchant, payment).items():
+            results["methods"][name] = {
+                "latency_seconds": measure_latency(call, make_request, iterations),
+                "throughput": [measure_throughput(call, make_request, level, iterations) for level in concurrency],
+                "memory": measure_memory(call, make_request, iterations),
+            }
+            print("%-24s p50 %.3f ms" % (name, results["methods"][name]["latency_seconds"]["p50"] * 1000),
+                  file=sys.stderr)
+
+    for name, make_request in get_requests().items():
+        request = make_request()
+        results["normalize"][name] = measure_micro(request.normalize, micro_iterations)
+
+    for name, (response_class, data) in get_responses().items():
+        results["response"][name] = measure_micro(lambda: response_class(data), micro_iterations)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Paykassa SDK against a local stand-in server")
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--micro-iterations", type=int, default=100000)
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    results = run(args.iterations, args.concurrency, args.micro_iterations)
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+RESPONSES = {
+    "sci_confirm_order": {
+        "transaction": "96401",
+        "shop_id": "123",
+        "order_id": "12345",
+        "amount": "1.01",
+        "currency": "BTC",
+        "system": "BitCoin",
+        "address": "3LaKdUrPfVyZeEVYpZei3HwjqQj5AHHTCE",
+        "tag": "",
+        "hash": "ba276492c1c8ff5bfad7ea46463aca85d9c447ee940aceeb71e4a726d89458cd",
+        "partial": "no",
+    },
+    "sci_confirm_transaction_notification": {
+        "transaction": "2431038",
+        "txid": "e2be8b51ad0ccbae2a2433f8c940035ce97903c7de1a1cefa1db40cc1cabb0e5",
+        "shop_id": "138",
+        "order_id": "order 1",
+        "amount": "1.00000000",
+        "fee": "0.00000000",
+        "currency": "DOGE",
+        "system": "Dogecoin",
+        "address_from": "",
+        "address": "DKpzDZuFoTpPpnpsMro8NBtmDz8rinCjqp",
+        "tag": "",
+        "confirmations": 0,
+        "required_confirmations": 3,
+        "status": "no",
+        "static": "yes",
+        "date_update": "2020-07-23 15:06:58",
+        "explorer_address_link": "https://explorer.paykassa.pro/address/dogecoin-doge/"
+                                 "DKpzDZuFoTpPpnpsMro8NBtmDz8rinCjqp",
+        "explorer_transaction_link": "https://explorer.paykassa.pro/transaction/dogecoin-doge/"
+                                     "e2be8b51ad0ccbae2a2433f8c940035ce97903c7de1a1cefa1db40cc1cabb0e5",
+    },
+    "sci_create_order_get_data": {
+        "invoice_id": "579205",
+        "order_id": "12345",
+        "wallet": "3LaKdUrPfVyZeEVYpZei3HwjqQj5AHHTCE",
+        "amount": "1.03030000",
+        "system": "BitCoin",
+        "currency": "BTC",
+        "url": "https://crypto.paykassa.pro/sci/index.php?hash="
+               "ba276492c1c8ff5bfad7ea46463aca85d9c447ee940aceeb71e4a726d89458cd",
+        "tag": False,
+    },
+    "sci_create_order": {
+        "url": "https://paykassa.app/sci/redir_test.php?hash="
+               "9ef8b443c9c73116e6f363382d3d285610a0314b7c9693901561a472d3934072",
+        "method": "GET",
+        "params": {"hash": "9ef8b443c9c73116e6f363382d3d285610a0314b7c9693901561a472d3934072"},
+    },
+    "api_get_shop_balance": {
+        "binancesmartchain_bep20_ada": "1100300.003423400",
+        "bitcoin_btc": "6.19148781",
+    },
+    "api_payment": {
+        "shop_id": "123",
+        "transaction": "130236",
+        "txid": "70d6dc6841782c6efd8deac4b44d9cc3338fda7af38043dd47d7cbad7e84d5dd",
+        "amount": "1.01",
+        "amount_pay": "1.0306",
+        "system": "BitCoin",
+        "currency": "BTC",
+        "number": "3LaKdUrPfVyZeEVYpZei3HwjqQj5AHHTCE",
+        "shop_commission_percent": "1.5",
+        "shop_commission_amount": "1.0",
+        "paid_commission": "shop",
+    },
+}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        form = parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode())
+        func = form.get("func", [""])[0]
+
+        if func == "api_get_shop_txids":
+            data = {invoice: [invoice * 4] for invoice in form.get("invoices[]", [])}
+        elif func in RESPONSES:
+            data = RESPONSES[func]
+        else:
+            data = None
+
+        body = json.dumps({
+            "error": data is None,
+            "message": "Ok" if data is not None else "Unknown function",
+            "data": data or {},
+        }).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer(object):
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._server = ThreadingHTTPServer((host, port), StandInHandler)
+        self._server.daemon_threads = True
+
+    def get_url(self) -> str:
+        return "http://%s:%d/" % self._server.server_address
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,70 @@
+from paykassa.dto import CheckPaymentRequest, CheckPaymentResponse, CheckTransactionRequest, CheckTransactionResponse, \
+    GenerateAddressRequest, GenerateAddressResponse, GetPaymentUrlRequest, GetPaymentUrlResponse
+from paykassa.async_transport import AsyncTransport
+from paykassa.client import AsyncClientBase
+from paykassa.transport import deadline
+
+
+class AsyncMerchantApiInterface(object):
+    async def check_payment(self, request: CheckPaymentRequest, timeout: float = None) -> CheckPaymentResponse:
+        pass
+
+    async def check_transaction(self, request: CheckTransactionRequest,
+                                timeout: float = None) -> CheckTransactionResponse:
+        pass
+
+    async def generate_address(self, request: GenerateAddressRequest,
+                               timeout: float = None) -> GenerateAddressResponse:
+        pass
+
+    async def get_payment_url(self, request: GetPaymentUrlRequest, timeout: float = None) -> GetPaymentUrlResponse:
+        pass
+
+
+class AsyncMerchantApiBase(AsyncClientBase, AsyncMerchantApiInterface):
+    BASE_URL = "https://paykassa.app/sci/"
+    API_VERSION = 0.4
+
+    def __init__(self, api_id: str, api_key: str, transport: AsyncTransport = None):
+        super(AsyncMerchantApiBase, self).__init__(transport)
+        self._sci_id = api_id
+        self._sci_key = api_key
+
+    def set_sci_id(self, api_id: str):
+        self._sci_id = api_id
+        return self
+
+    def set_sci_key(self, api_key: str):
+        self._sci_key = api_key
+        return self
+
+    def _get_credentials(self) -> dict:
+        return {"sci_id": self._sci_id, "sci_key": self._sci_key}
+
+
+class AsyncMerchantApi(AsyncMerchantApiBase):
+    def __init__(self, sci_id: str, sci_key: str, transport: AsyncTransport = None):
+        super(AsyncMerchantApi, self).__init__(sci_id, sci_key, transport)
+
+    # see https://paykassa.pro/docs/#api-SCI-sci_confirm_order
+    async def check_payment(self, request: CheckPaymentRequest, timeout: float = None) -> CheckPaymentResponse:
+        with deadline(timeout):
+            return CheckPaymentResponse(await self._make_request("sci_confirm_order", request.normalize()))
+
+    # see https://paykassa.pro/docs/#api-SCI-sci_confirm_transaction_notification
+    async def check_transaction(self, request: CheckTransactionRequest,
+                                timeout: float = None) -> CheckTransactionResponse:
+        with deadline(timeout):
+            return CheckTransactionResponse(
+                await self._make_request("sci_confirm_transaction_notification", request.normalize()))
+
+    # see https://paykassa.pro/docs/#api-SCI-sci_create_order_get_data
+    async def generate_address(self, request: GenerateAddressRequest,
+                               timeout: float = None) -> GenerateAddressResponse:
+        with deadline(timeout):
+            return GenerateAddressResponse(await self._make_request("sci_create_order_get_data", request.normalize()))
+
+    # see https://paykassa.pro/docs/#api-SCI-sci_create_order
+    async def get_payment_url(self, request: GetPaymentUrlRequest, timeout: float = None) -> GetPaymentUrlResponse:
+        with deadline(timeout):
+            return GetPaymentUrlResponse(await self._make_request("sci_create_order", request.normalize()))
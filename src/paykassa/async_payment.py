@@ -0,0 +1,74 @@
+from typing import Iterable, AsyncIterator, Tuple
+
+from paykassa.dto import CheckBalanceRequest, CheckBalanceResponse, \
+    MakePaymentRequest, MakePaymentResponse, \
+    GetTxidsOfInvoicesResponse, \
+    GetTxidsOfInvoicesRequest
+from paykassa.batch import run_batch_async
+from paykassa.async_transport import AsyncTransport
+from paykassa.client import AsyncClientBase
+from paykassa.error import get_error_response
+from paykassa.transport import deadline
+
+
+class AsyncPaymentApiInterface(object):
+    async def check_balance(self, request: CheckBalanceRequest, timeout: float = None) -> CheckBalanceResponse:
+        pass
+
+    async def make_payment(self, request: MakePaymentRequest, timeout: float = None) -> MakePaymentResponse:
+        pass
+
+    async def get_txids_by_invoices(self, request: GetTxidsOfInvoicesRequest,
+                                    timeout: float = None) -> GetTxidsOfInvoicesResponse:
+        pass
+
+
+class AsyncPaymentApiBase(AsyncClientBase, AsyncPaymentApiInterface):
+    BASE_URL = "https://paykassa.app/api/"
+    API_VERSION = 0.9
+
+    def __init__(self, api_id: int, api_key: str, transport: AsyncTransport = None):
+        super(AsyncPaymentApiBase, self).__init__(transport)
+        self._api_id = api_id
+        self._api_key = api_key
+
+    def set_api_id(self, api_id: str) -> 'AsyncPaymentApiBase':
+        self._api_id = api_id
+        return self
+
+    def set_api_key(self, api_key: str) -> 'AsyncPaymentApiBase':
+        self._api_key = api_key
+        return self
+
+    def _get_credentials(self) -> dict:
+        return {"api_id": self._api_id, "api_key": self._api_key}
+
+
+class AsyncPaymentApi(AsyncPaymentApiBase):
+    def __init__(self, api_id: int, api_key: str, transport: AsyncTransport = None):
+        super(AsyncPaymentApi, self).__init__(api_id, api_key, transport)
+
+    # see https://paykassa.pro/docs/#api-API-api_get_shop_balance
+    async def check_balance(self, request: CheckBalanceRequest, timeout: float = None) -> CheckBalanceResponse:
+        with deadline(timeout):
+            return CheckBalanceResponse(await self._make_request("api_get_shop_balance", request.normalize()))
+
+    # see https://paykassa.pro/docs/#api-API-api_payment
+    async def make_payment(self, request: MakePaymentRequest, timeout: float = None) -> MakePaymentResponse:
+        with deadline(timeout):
+            return MakePaymentResponse(await self._make_request('api_payment', request.normalize()))
+
+    # see https://paykassa.pro/docs/#api-API-api_get_shop_txids
+    async def get_txids_by_invoices(self, request: GetTxidsOfInvoicesRequest,
+                                    timeout: float = None) -> GetTxidsOfInvoicesResponse:
+        with deadline(timeout):
+            return GetTxidsOfInvoicesResponse(await self._make_request('api_get_shop_txids', request.normalize()))
+
+    def make_payments(self, requests: Iterable[MakePaymentRequest], concurrency: int = 8, ordered: bool = True,
+                      timeout: float = None) -> AsyncIterator[Tuple[MakePaymentRequest, MakePaymentResponse]]:
+        return run_batch_async(lambda request: self.make_payment(request, timeout), requests, concurrency, ordered,
+                               AsyncPaymentApi.__get_failed_payment)
+
+    @staticmethod
+    def __get_failed_payment(e: Exception) -> MakePaymentResponse:
+        return MakePaymentResponse(get_error_response(e))
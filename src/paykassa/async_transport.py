@@ -0,0 +1,59 @@
+import asyncio
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from paykassa.decoder import Decoder, get_decoder
+from paykassa.error import RequestTimeout
+from paykassa.form import HEADERS, encode
+from paykassa.transport import get_remaining_time
+
+
+class AsyncTransport(object):
+    def __init__(self, limit: int = 100, limit_per_host: int = 0, keepalive_timeout: float = 15.0,
+                 connect_timeout: float = 5.0, read_timeout: float = 30.0):
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._keepalive_timeout = keepalive_timeout
+        self._connect_timeout = connect_timeout
+        self._read_timeout = read_timeout
+        self._session = None
+
+    async def post(self, url: str, data: dict, decoder: Decoder = None) -> dict:
+        remaining = get_remaining_time()
+        decode = decoder or get_decoder()
+        session = self.__get_session()
+        timeout = aiohttp.ClientTimeout(total=remaining, connect=self._connect_timeout, sock_read=self._read_timeout)
+
+        try:
+            async with session.post(url, data=encode(data), headers=HEADERS, timeout=timeout) as response:
+                return decode(await response.read())
+        except asyncio.TimeoutError as e:
+            raise RequestTimeout(str(e) or "Request timed out") from e
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def __get_session(self) -> 'aiohttp.ClientSession':
+        if aiohttp is None:
+            raise ImportError("AsyncTransport requires aiohttp, install paykassa-api-sdk[async]")
+
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self._limit,
+                limit_per_host=self._limit_per_host,
+                keepalive_timeout=self._keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+
+        return self._session
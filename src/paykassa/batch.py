@@ -0,0 +1,87 @@
+import asyncio
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Iterable, Iterator, AsyncIterator, Tuple, Any
+
+_EXHAUSTED = object()
+
+
+def run_batch(fn: Callable[[Any], Any], items: Iterable, concurrency: int = 8, ordered: bool = True,
+              on_error: Callable[[Exception], Any] = None) -> Iterator[Tuple[Any, Any]]:
+    if concurrency < 1:
+        raise ValueError("Concurrency must be at least 1")
+
+    iterator = iter(items)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = deque()
+
+        def submit() -> bool:
+            item = next(iterator, _EXHAUSTED)
+            if item is _EXHAUSTED:
+                return False
+
+            pending.append((item, executor.submit(contextvars.copy_context().run, fn, item)))
+            return True
+
+        while len(pending) < concurrency and submit():
+            pass
+
+        while pending:
+            if ordered:
+                item, future = pending.popleft()
+                wait([future])
+            else:
+                done, _ = wait([future for _, future in pending], return_when=FIRST_COMPLETED)
+                item, future = next(entry for entry in pending if entry[1] in done)
+                pending.remove((item, future))
+
+            submit()
+            yield item, _get_result(future.exception(), future, on_error)
+
+
+async def run_batch_async(fn: Callable[[Any], Any], items: Iterable, concurrency: int = 8, ordered: bool = True,
+                          on_error: Callable[[Exception], Any] = None) -> AsyncIterator[Tuple[Any, Any]]:
+    if concurrency < 1:
+        raise ValueError("Concurrency must be at least 1")
+
+    iterator = iter(items)
+    pending = deque()
+
+    def submit() -> bool:
+        item = next(iterator, _EXHAUSTED)
+        if item is _EXHAUSTED:
+            return False
+
+        pending.append((item, asyncio.ensure_future(fn(item))))
+        return True
+
+    try:
+        while len(pending) < concurrency and submit():
+            pass
+
+        while pending:
+            if ordered:
+                item, task = pending.popleft()
+                await asyncio.wait([task])
+            else:
+                done, _ = await asyncio.wait([task for _, task in pending], return_when=asyncio.FIRST_COMPLETED)
+                item, task = next(entry for entry in pending if entry[1] in done)
+                pending.remove((item, task))
+
+            submit()
+            yield item, _get_result(task.exception(), task, on_error)
+    finally:
+        for _, task in pending:
+            task.cancel()
+
+
+def _get_result(exception: Exception, future, on_error: Callable[[Exception], Any]):
+    if exception is None:
+        return future.result()
+
+    if on_error is None:
+        raise exception
+
+    return on_error(exception)
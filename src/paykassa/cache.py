@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from paykassa.error import RequestTimeout
+from paykassa.transport import get_remaining_time
+
+_MISSING = object()
+
+
+class _Flight(object):
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TtlCache(object):
+    def __init__(self, ttl: float, max_size: int = None):
+        self._ttl = ttl
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._flights = {}
+        self._generations = {}
+        self._epoch = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            return self.__get(key, time.monotonic(), default)
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self.__set(key, value)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._flights.pop(key, None)
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._flights.clear()
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any],
+                    cacheable: Callable[[Any], bool] = None) -> Any:
+        with self._lock:
+            value = self.__get(key, time.monotonic(), _MISSING)
+            if value is not _MISSING:
+                return value
+
+            flight = self._flights.get(key)
+            if flight is not None:
+                leader = False
+            else:
+                leader = True
+                flight = self._flights[key] = _Flight()
+                generation = (self._epoch, self._generations.get(key, 0))
+
+        if not leader:
+            # a follower keeps its own deadline, a slow leader doesn't hold it past that
+            if not flight.done.wait(get_remaining_time()):
+                raise RequestTimeout("Deadline exceeded")
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+
+                if flight.error is None and (self._epoch, self._generations.get(key, 0)) == generation \
+                        and (cacheable is None or cacheable(flight.value)):
+                    self.__set(key, flight.value)
+
+            flight.done.set()
+
+        return flight.value
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __set(self, key: Hashable, value: Any):
+        self._entries[key] = (time.monotonic() + self._ttl, value)
+        self._entries.move_to_end(key)
+
+        if self._max_size is not None:
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def __get(self, key: Hashable, now: float, default: Any) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+
+        expires_at, value = entry
+        if expires_at <= now:
+            del self._entries[key]
+            return default
+
+        self._entries.move_to_end(key)
+        return value
@@ -0,0 +1,126 @@
+from paykassa.async_transport import AsyncTransport
+from paykassa.decoder import Decoder
+from paykassa.error import get_error_response
+from paykassa.form import RequestTemplate, CONSTANT_FIELDS
+from paykassa.hedge import HedgePolicy
+from paykassa.middleware import Middleware, Call, Pipeline, AsyncPipeline
+from paykassa.ratelimit import RateLimiter
+from paykassa.retry import RetryPolicy, CircuitBreaker
+from paykassa.transport import Transport
+
+
+class _ClientBase(object):
+    BASE_URL = ""
+    API_VERSION = None
+
+    def __init__(self, transport, owns_transport: bool):
+        self._owns_transport = owns_transport
+        self._transport = transport
+        self._retry_policy = None
+        self._circuit_breaker = None
+        self._hedge_policy = None
+        self._rate_limiter = None
+        self._middlewares = []
+        self._decoder = None
+        self._templates = {}
+
+    def set_retry_policy(self, retry_policy: RetryPolicy = None) -> '_ClientBase':
+        self._retry_policy = retry_policy
+        return self
+
+    def set_circuit_breaker(self, circuit_breaker: CircuitBreaker = None) -> '_ClientBase':
+        self._circuit_breaker = circuit_breaker
+        return self
+
+    def set_hedge_policy(self, hedge_policy: HedgePolicy = None) -> '_ClientBase':
+        self._hedge_policy = hedge_policy
+        return self
+
+    def set_rate_limiter(self, rate_limiter: RateLimiter = None) -> '_ClientBase':
+        self._rate_limiter = rate_limiter
+        return self
+
+    def add_middleware(self, middleware: Middleware) -> '_ClientBase':
+        self._middlewares.append(middleware)
+        return self
+
+    def set_decoder(self, decoder: Decoder = None) -> '_ClientBase':
+        self._decoder = decoder
+        return self
+
+    def _close_policies(self):
+        if self._hedge_policy is not None:
+            self._hedge_policy.close()
+
+    def _get_credentials(self) -> dict:
+        pass
+
+    def _get_call(self, endpoint: str, request: dict) -> Call:
+        credentials = self._get_credentials()
+        key = (endpoint,) + tuple(credentials.values())
+
+        template = self._templates.get(key)
+        if template is None:
+            template = RequestTemplate(dict(func=endpoint, **credentials), CONSTANT_FIELDS.get(endpoint))
+            self._templates[key] = template
+
+        # the first credential is the id, it names the rate limiter bucket
+        return Call(endpoint, template.fill(request), self._get_api_url(), next(iter(credentials.values())))
+
+    def _get_middlewares(self) -> list:
+        built_in = [self._retry_policy, self._circuit_breaker, self._hedge_policy, self._rate_limiter]
+        return self._middlewares + [middleware for middleware in built_in if middleware is not None]
+
+    def _get_api_url(self) -> str:
+        return self.BASE_URL + str(self.API_VERSION) + "/index.php"
+
+
+class ClientBase(_ClientBase):
+    def __init__(self, transport: Transport = None):
+        super(ClientBase, self).__init__(transport if transport is not None else Transport(), transport is None)
+
+    def _make_request(self, endpoint: str, request: dict) -> dict:
+        try:
+            return Pipeline(self._get_middlewares(), self.__post).run(self._get_call(endpoint, request))
+        except Exception as e:
+            return get_error_response(e)
+
+    def close(self):
+        self._close_policies()
+        if self._owns_transport:
+            self._transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __post(self, call: Call) -> dict:
+        return self._transport.post(call.url, call.request, self._decoder)
+
+
+class AsyncClientBase(_ClientBase):
+    def __init__(self, transport: AsyncTransport = None):
+        super(AsyncClientBase, self).__init__(transport if transport is not None else AsyncTransport(),
+                                              transport is None)
+
+    async def _make_request(self, endpoint: str, request: dict) -> dict:
+        try:
+            return await AsyncPipeline(self._get_middlewares(), self.__post).run(self._get_call(endpoint, request))
+        except Exception as e:
+            return get_error_response(e)
+
+    async def close(self):
+        self._close_policies()
+        if self._owns_transport:
+            await self._transport.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def __post(self, call: Call) -> dict:
+        return await self._transport.post(call.url, call.request, self._decoder)
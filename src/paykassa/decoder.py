@@ -0,0 +1,34 @@
+import json
+from typing import Callable
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+Decoder = Callable[[bytes], dict]
+
+_decoder = None
+
+
+def stdlib_decoder(body: bytes) -> dict:
+    return json.loads(body)
+
+
+def orjson_decoder(body: bytes) -> dict:
+    if orjson is None:
+        raise ImportError("orjson_decoder requires orjson, install paykassa-api-sdk[fast]")
+
+    return orjson.loads(body)
+
+
+def set_decoder(decoder: Decoder = None):
+    global _decoder
+    _decoder = decoder
+
+
+def get_decoder() -> Decoder:
+    if _decoder is not None:
+        return _decoder
+
+    return orjson.loads if orjson is not None else json.loads
@@ -1,33 +1,45 @@
-from paykassa.struct import TransactionPriority, Currency, System, CommissionPayer
+from decimal import Decimal
+from typing import Iterable, Iterator, Tuple, Dict
+
+from paykassa.decoder import Decoder, get_decoder
+from paykassa.struct import TransactionPriority, Currency, System, CommissionPayer, ErrorType, SYSTEMS_BY_NAME, \
+    CURRENCIES_BY_VALUE, BALANCE_KEYS, PAIRS_BY_BALANCE_KEY, validate_pair
+
+_MISSING = object()
 
 
 class Request(object):
+    __slots__ = ()
+
     def normalize(self) -> dict:
         pass
 
 
 class Response:
-    _response_systems = {
-        "BitCoin": System.BITCOIN,
-        "Ethereum": System.ETHEREUM,
-        "Litecoin": System.BITCOIN,
-        "Dogecoin": System.DOGECOIN,
-        "Dash": System.DASH,
-        "BitcoinCash": System.BITCOINCASH,
-        "Ripple": System.RIPPLE,
-        "TRON": System.TRON,
-        "Stellar": System.STELLAR,
-        "BinanceCoin": System.BINANCECOIN,
-        "TRON_TRC20": System.TRON_TRC20,
-        "BinanceSmartChain_BEP20": System.BINANCESMARTCHAIN_BEP20,
-        "Ethereum_ERC20": System.ETHEREUM_ERC20,
-        "TON": System.TON,
-    }
+    __slots__ = ("_error", "_message", "_data", "_error_type")
+
+    _fields = ()
+    _parsed_fields = {}
+    _parsed_slots = {}
 
-    def __init__(self, data: dict):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._parsed_slots = {name: "_parsed_" + name for name in cls._parsed_fields}
+
+    def __init__(self, data: dict, keep_raw: bool = True, eager: bool = False):
         self._error = data["error"]
         self._message = data["message"]
         self._data = data["data"]
+        self._error_type = ErrorType(data.get("error_type", ErrorType.API.value)) if self._error else None
+
+        if eager:
+            self.parse()
+        if not keep_raw:
+            self.compact()
+
+    @classmethod
+    def from_bytes(cls, body: bytes, decoder: Decoder = None, keep_raw: bool = True, eager: bool = False):
+        return cls((decoder or get_decoder())(body), keep_raw, eager)
 
     def has_error(self) -> bool:
         return self._error
@@ -35,14 +47,84 @@ class Response:
     def get_message(self) -> str:
         return self._message
 
+    def get_error_type(self) -> ErrorType:
+        return self._error_type
+
+    def is_timeout(self) -> bool:
+        return self._error_type is ErrorType.TIMEOUT
+
+    def get_data(self) -> dict:
+        if self._data is not None:
+            return dict(self._data)
+
+        return {name: getattr(self, "_" + name) for name in self._fields if hasattr(self, "_" + name)}
+
+    def parse(self) -> 'Response':
+        for name, (key, _) in self._parsed_fields.items():
+            if self._has(key):
+                self._get_parsed(name)
+        return self
+
+    def compact(self) -> 'Response':
+        if self._data is None or not self._fields:
+            return self
+
+        for name in self._fields:
+            if name in self._data:
+                setattr(self, "_" + name, self._data[name])
+        self._data = None
+        return self
+
+    def _has(self, name: str) -> bool:
+        if self._data is not None:
+            return name in self._data
+
+        return hasattr(self, "_" + name)
+
+    def _get(self, name: str):
+        if self._data is not None:
+            return self._data[name]
+
+        try:
+            return getattr(self, "_" + name)
+        except AttributeError:
+            raise KeyError(name) from None
+
+    def _get_parsed(self, name: str):
+        slot = self._parsed_slots[name]
+        value = getattr(self, slot, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        key, parse = self._parsed_fields[name]
+        value = parse(self._get(key))
+        setattr(self, slot, value)
+        return value
+
     def _get_system(self, name: str) -> System:
-        if name not in self._response_systems:
+        return Response._parse_system(name)
+
+    @staticmethod
+    def _parse_system(name: str) -> System:
+        system = SYSTEMS_BY_NAME.get(name)
+        if system is None:
             raise KeyError("Unknown system: " + name)
 
-        return self._response_systems[name]
+        return system
+
+    @staticmethod
+    def _parse_currency(value: str) -> Currency:
+        currency = CURRENCIES_BY_VALUE.get(value)
+        return currency if currency is not None else Currency(value)
+
+    @staticmethod
+    def _parse_decimal(value) -> Decimal:
+        return Decimal(str(value))
 
 
 class CheckBalanceRequest(Request):
+    __slots__ = ("__shop_id",)
+
     def __init__(self):
         self.__shop_id = ""
 
@@ -57,18 +139,58 @@ class CheckBalanceRequest(Request):
 
 
 class CheckBalanceResponse(Response):
+    __slots__ = ("_balances",)
+
     def get_balance(self, system: System, currency: Currency) -> str:
-        if self.__get_system_currency_pair(currency, system) not in self._data:
+        key = BALANCE_KEYS[(system, currency)]
+        if key not in self._data:
             raise KeyError("Can't get a balance by system %s and currency %s" % (system.name, currency.name))
 
-        return str(self._data[self.__get_system_currency_pair(currency, system)])
+        return str(self._data[key])
 
-    @staticmethod
-    def __get_system_currency_pair(currency, system):
-        return system.name.lower() + '_' + currency.name.lower()
+    def get_balance_decimal(self, system: System, currency: Currency) -> Decimal:
+        return self.__get_balances().get((system, currency), Decimal(0))
+
+    def get_balances(self, pairs: Iterable[Tuple[System, Currency]] = None) -> Dict[Tuple[System, Currency], Decimal]:
+        balances = self.__get_balances()
+        if pairs is None:
+            return dict(balances)
+
+        return {pair: balances.get(pair, Decimal(0)) for pair in pairs}
+
+    def iter_balances(self) -> Iterator[Tuple[System, Currency, Decimal]]:
+        for (system, currency), amount in self.__get_balances().items():
+            if amount:
+                yield system, currency, amount
+
+    def parse(self) -> 'CheckBalanceResponse':
+        self.__get_balances()
+        return self
+
+    def __get_balances(self) -> Dict[Tuple[System, Currency], Decimal]:
+        try:
+            return self._balances
+        except AttributeError:
+            pass
+
+        self._balances = {PAIRS_BY_BALANCE_KEY[key]: Response._parse_decimal(amount)
+                          for key, amount in (self._data or {}).items() if key in PAIRS_BY_BALANCE_KEY}
+        return self._balances
 
 
 class MakePaymentRequest(Request):
+    __slots__ = (
+        "__test",
+        "__priority",
+        "__tag",
+        "__number",
+        "__paid_commission",
+        "__system",
+        "__currency",
+        "__shop_id",
+        "__amount",
+    )
+
     def __init__(self):
         self.__test = False
         self.__priority = TransactionPriority.MEDIUM
@@ -117,6 +239,8 @@ class MakePaymentRequest(Request):
         return self
 
     def normalize(self) -> dict:
+        validate_pair(self.__system, self.__currency)
+
         return {
             "priority": self.__priority.value,
             "tag": self.__tag,
@@ -131,41 +255,69 @@ class MakePaymentRequest(Request):
 
 
 class MakePaymentResponse(Response):
+    _fields = (
+        "shop_id", "transaction", "txid", "amount", "amount_pay", "system", "currency", "number",
+        "shop_commission_percent", "shop_commission_amount", "paid_commission",
+    )
+    _parsed_fields = {
+        "amount_decimal": ("amount", Response._parse_decimal),
+        "amount_pay_decimal": ("amount_pay", Response._parse_decimal),
+        "system": ("system", Response._parse_system),
+        "currency": ("currency", Response._parse_currency),
+        "shop_commission_percent_decimal": ("shop_commission_percent", Response._parse_decimal),
+        "shop_commission_amount_decimal": ("shop_commission_amount", Response._parse_decimal),
+    }
+    __slots__ = tuple("_" + name for name in _fields) + tuple("_parsed_" + name for name in _parsed_fields)
+
     def get_shop_id(self) -> str:
-        return str(self._data["shop_id"])
+        return str(self._get("shop_id"))
 
     def get_transaction(self) -> str:
-        return str(self._data["transaction"])
+        return str(self._get("transaction"))
 
     def get_txid(self) -> str:
-        return str(self._data["txid"])
+        return str(self._get("txid"))
 
     def get_amount(self) -> str:
-        return str(self._data["amount"])
+        return str(self._get("amount"))
+
+    def get_amount_decimal(self) -> Decimal:
+        return self._get_parsed("amount_decimal")
 
     def get_amount_pay(self) -> str:
-        return str(self._data["amount_pay"])
+        return str(self._get("amount_pay"))
+
+    def get_amount_pay_decimal(self) -> Decimal:
+        return self._get_parsed("amount_pay_decimal")
 
     def get_system(self) -> System:
-        return self._get_system(self._data["system"])
+        return self._get_parsed("system")
 
     def get_currency(self) -> Currency:
-        return Currency(str(self._data["currency"]))
+        return self._get_parsed("currency")
 
     def get_number(self) -> str:
-        return str(self._data["number"])
+        return str(self._get("number"))
 
     def get_shop_commission_percent(self) -> str:
-        return str(self._data["shop_commission_percent"])
+        return str(self._get("shop_commission_percent"))
+
+    def get_shop_commission_percent_decimal(self) -> Decimal:
+        return self._get_parsed("shop_commission_percent_decimal")
 
     def get_shop_commission_amount(self) -> str:
-        return str(self._data["shop_commission_amount"])
+        return str(self._get("shop_commission_amount"))
+
+    def get_shop_commission_amount_decimal(self) -> Decimal:
+        return self._get_parsed("shop_commission_amount_decimal")
 
     def get_paid_commission(self) -> str:
-        return str(self._data["paid_commission"])
+        return str(self._get("paid_commission"))
 
 
 class CheckPaymentRequest(Request):
+    __slots__ = ("__test", "__private_hash")
+
     def __init__(self):
         self.__test = False
         self.__private_hash = ""
@@ -186,38 +338,53 @@ class CheckPaymentRequest(Request):
 
 
 class CheckPaymentResponse(Response):
+    _fields = (
+        "transaction", "shop_id", "order_id", "amount", "currency", "system", "address", "tag", "hash", "partial",
+    )
+    _parsed_fields = {
+        "amount_decimal": ("amount", Response._parse_decimal),
+        "currency": ("currency", Response._parse_currency),
+        "system": ("system", Response._parse_system),
+    }
+    __slots__ = tuple("_" + name for name in _fields) + tuple("_parsed_" + name for name in _parsed_fields)
+
     def get_transaction(self) -> int:
-        return str(self._data["transaction"])
+        return str(self._get("transaction"))
 
     def get_shop_id(self) -> str:
-        return str(self._data["shop_id"])
+        return str(self._get("shop_id"))
 
     def get_order_id(self) -> str:
-        return str(self._data["order_id"])
+        return str(self._get("order_id"))
 
     def get_amount(self) -> str:
-        return str(self._data["amount"])
+        return str(self._get("amount"))
+
+    def get_amount_decimal(self) -> Decimal:
+        return self._get_parsed("amount_decimal")
 
     def get_currency(self) -> Currency:
-        return Currency(self._data["currency"])
+        return self._get_parsed("currency")
 
     def get_system(self) -> System:
-        return self._get_system(self._data["system"])
+        return self._get_parsed("system")
 
     def get_address(self) -> str:
-        return str(self._data["address"])
+        return str(self._get("address"))
 
     def get_tag(self) -> str:
-        return str(self._data["tag"]) if "tag" in self._data else ""
+        return str(self._get("tag")) if self._has("tag") else ""
 
     def get_hash(self) -> str:
-        return str(self._data["hash"])
+        return str(self._get("hash"))
 
     def is_partial(self) -> bool:
-        return True if self._data["partial"] == "yes" else False
+        return True if self._get("partial") == "yes" else False
 
 
 class CheckTransactionRequest(Request):
+    __slots__ = ("__test", "__private_hash")
+
     def __init__(self):
         self.__test = False
         self.__private_hash = ""
@@ -238,59 +405,80 @@ class CheckTransactionRequest(Request):
 
 
 class CheckTransactionResponse(Response):
+    _fields = (
+        "transaction", "txid", "shop_id", "order_id", "amount", "fee", "currency", "system", "address_from",
+        "address", "tag", "confirmations", "required_confirmations", "status", "date_update",
+        "explorer_address_link", "explorer_transaction_link",
+    )
+    _parsed_fields = {
+        "amount_decimal": ("amount", Response._parse_decimal),
+        "fee_decimal": ("fee", Response._parse_decimal),
+        "currency": ("currency", Response._parse_currency),
+        "system": ("system", Response._parse_system),
+    }
+    __slots__ = tuple("_" + name for name in _fields) + tuple("_parsed_" + name for name in _parsed_fields)
+
     def get_transaction(self) -> str:
-        return str(self._data["transaction"])
+        return str(self._get("transaction"))
 
     def get_txid(self) -> str:
-        return str(self._data["txid"])
+        return str(self._get("txid"))
 
     def get_shop_id(self) -> str:
-        return str(self._data["shop_id"])
+        return str(self._get("shop_id"))
 
     def get_order_id(self) -> str:
-        return str(self._data["order_id"])
+        return str(self._get("order_id"))
 
     def get_amount(self) -> str:
-        return str(self._data["amount"])
+        return str(self._get("amount"))
+
+    def get_amount_decimal(self) -> Decimal:
+        return self._get_parsed("amount_decimal")
 
     def get_fee(self) -> str:
-        return str(self._data["fee"])
+        return str(self._get("fee"))
+
+    def get_fee_decimal(self) -> Decimal:
+        return self._get_parsed("fee_decimal")
 
     def get_currency(self) -> Currency:
-        return Currency(self._data["currency"])
+        return self._get_parsed("currency")
 
     def get_system(self) -> System:
-        return self._get_system(self._data["system"])
+        return self._get_parsed("system")
 
     def get_address_from(self) -> str:
-        return str(self._data["address_from"])
+        return str(self._get("address_from"))
 
     def get_address(self) -> str:
-        return str(self._data["address"])
+        return str(self._get("address"))
 
     def get_tag(self) -> str:
-        return str(self._data["tag"]) if "tag" in self._data else ""
+        return str(self._get("tag")) if self._has("tag") else ""
 
     def get_confirmations(self) -> int:
-        return int(self._data["confirmations"])
+        return int(self._get("confirmations"))
 
     def get_required_confirmations(self) -> int:
-        return int(self._data["required_confirmations"])
+        return int(self._get("required_confirmations"))
 
     def get_status(self) -> str:
-        return str(self._data["status"])
+        return str(self._get("status"))
 
     def get_date_update(self) -> str:
-        return str(self._data["date_update"])
+        return str(self._get("date_update"))
 
     def get_explorer_address_link(self) -> str:
-        return str(self._data["explorer_address_link"])
+        return str(self._get("explorer_address_link"))
 
     def get_explorer_transaction_link(self) -> str:
-        return str(self._data["explorer_transaction_link"])
+        return str(self._get("explorer_transaction_link"))
 
 
 class GenerateAddressRequest(Request):
+    __slots__ = ("__test", "__order_id", "__amount", "__currency", "__system", "__comment", "__paid_commission")
+
     def __init__(self):
         self.__test = False
         self.__order_id = ""
@@ -329,6 +517,8 @@ class GenerateAddressRequest(Request):
         return self
 
     def normalize(self) -> dict:
+        validate_pair(self.__system, self.__currency)
+
         return {
             "order_id": self.__order_id,
             "amount": self.__amount,
@@ -342,35 +532,48 @@ class GenerateAddressRequest(Request):
 
 
 class GenerateAddressResponse(Response):
+    _fields = ("invoice_id", "status", "order_id", "wallet", "amount", "system", "currency", "url", "tag")
+    _parsed_fields = {
+        "amount_decimal": ("amount", Response._parse_decimal),
+        "system": ("system", Response._parse_system),
+        "currency": ("currency", Response._parse_currency),
+    }
+    __slots__ = tuple("_" + name for name in _fields) + tuple("_parsed_" + name for name in _parsed_fields)
+
     def get_invoice_id(self) -> int:
-        return str(self._data["invoice_id"])
+        return str(self._get("invoice_id"))
 
     def get_status(self) -> str:
-        return str(self._data["status"])
+        return str(self._get("status"))
 
     def get_order_id(self) -> str:
-        return str(self._data["order_id"])
+        return str(self._get("order_id"))
 
     def get_wallet(self) -> str:
-        return str(self._data["wallet"])
+        return str(self._get("wallet"))
 
     def get_amount(self) -> str:
-        return str(self._data["amount"])
+        return str(self._get("amount"))
+
+    def get_amount_decimal(self) -> Decimal:
+        return self._get_parsed("amount_decimal")
 
     def get_system(self) -> System:
-        return self._get_system(self._data["system"])
+        return self._get_parsed("system")
 
     def get_currency(self) -> Currency:
-        return Currency(self._data["currency"])
+        return self._get_parsed("currency")
 
     def get_url(self) -> str:
-        return str(self._data["url"])
+        return str(self._get("url"))
 
     def get_tag(self) -> str:
-        return str(self._data["tag"]) if "tag" in self._data else ""
+        return str(self._get("tag")) if self._has("tag") else ""
 
 
 class GetPaymentUrlRequest(Request):
+    __slots__ = ("__test", "__order_id", "__amount", "__currency", "__system", "__comment", "__paid_commission")
+
     def __init__(self):
         self.__test = False
         self.__order_id = ""
@@ -409,6 +612,8 @@ class GetPaymentUrlRequest(Request):
         return self
 
     def normalize(self) -> dict:
+        validate_pair(self.__system, self.__currency)
+
         return {
             "order_id": self.__order_id,
             "amount": self.__amount,
@@ -422,17 +627,22 @@ class GetPaymentUrlRequest(Request):
 
 
 class GetPaymentUrlResponse(Response):
+    _fields = ("url", "method", "params")
+    __slots__ = tuple("_" + name for name in _fields)
+
     def get_url(self) -> str:
-        return str(self._data["url"])
+        return str(self._get("url"))
 
     def get_method(self) -> str:
-        return str(self._data["method"])
+        return str(self._get("method"))
 
     def get_params(self) -> dict:
-        return self._data["params"]
+        return self._get("params")
 
 
 class GetTxidsOfInvoicesRequest(Request):
+    __slots__ = ("__shop_id", "__invoices")
+
     def __init__(self):
         self.__shop_id = ""
         self.__invoices = []
@@ -452,7 +662,12 @@ class GetTxidsOfInvoicesRequest(Request):
 
 
 class GetTxidsOfInvoicesResponse(Response):
+    __slots__ = ()
+
     def get_txids_of_invoice(self, invoice_id: str) -> list[str]:
         if invoice_id not in self._data:
             raise KeyError("The txids of the invoice %s is not found" % (invoice_id, ))
-        return self._data[invoice_id];
\ No newline at end of file
+        return self._data[invoice_id]
+
+    def get_all_txids(self) -> dict:
+        return self._data or {}
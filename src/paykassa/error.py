@@ -0,0 +1,36 @@
+from paykassa.dto import Response
+from paykassa.struct import ErrorType
+
+
+class ApiError(Exception):
+    def __init__(self, response: Response):
+        super(ApiError, self).__init__(response.get_message())
+        self._response = response
+
+    def get_response(self) -> Response:
+        return self._response
+
+
+class TransportError(Exception):
+    error_type = ErrorType.TRANSPORT
+
+
+class RequestTimeout(TransportError):
+    error_type = ErrorType.TIMEOUT
+
+
+class CircuitOpenError(TransportError):
+    error_type = ErrorType.CIRCUIT_OPEN
+
+
+class RateLimitExceeded(TransportError):
+    error_type = ErrorType.RATE_LIMITED
+
+
+def get_error_response(e: Exception) -> dict:
+    return {
+        "error": True,
+        "message": str(e),
+        "data": {},
+        "error_type": getattr(e, "error_type", ErrorType.TRANSPORT).value,
+    }
@@ -0,0 +1,156 @@
+from decimal import Decimal, InvalidOperation
+from enum import Enum
+from typing import Iterable, Dict, Callable
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+from paykassa.dto import Response, CheckTransactionResponse, CheckPaymentResponse, MakePaymentResponse
+
+COLUMNS = {
+    CheckTransactionResponse: {
+        "transaction": CheckTransactionResponse.get_transaction,
+        "txid": CheckTransactionResponse.get_txid,
+        "shop_id": CheckTransactionResponse.get_shop_id,
+        "order_id": CheckTransactionResponse.get_order_id,
+        "amount": CheckTransactionResponse.get_amount_decimal,
+        "fee": CheckTransactionResponse.get_fee_decimal,
+        "currency": CheckTransactionResponse.get_currency,
+        "system": CheckTransactionResponse.get_system,
+        "address": CheckTransactionResponse.get_address,
+        "confirmations": CheckTransactionResponse.get_confirmations,
+        "required_confirmations": CheckTransactionResponse.get_required_confirmations,
+        "status": CheckTransactionResponse.get_status,
+        "date_update": CheckTransactionResponse.get_date_update,
+    },
+    CheckPaymentResponse: {
+        "transaction": CheckPaymentResponse.get_transaction,
+        "shop_id": CheckPaymentResponse.get_shop_id,
+        "order_id": CheckPaymentResponse.get_order_id,
+        "amount": CheckPaymentResponse.get_amount_decimal,
+        "currency": CheckPaymentResponse.get_currency,
+        "system": CheckPaymentResponse.get_system,
+        "address": CheckPaymentResponse.get_address,
+        "hash": CheckPaymentResponse.get_hash,
+        "partial": CheckPaymentResponse.is_partial,
+    },
+    MakePaymentResponse: {
+        "transaction": MakePaymentResponse.get_transaction,
+        "txid": MakePaymentResponse.get_txid,
+        "shop_id": MakePaymentResponse.get_shop_id,
+        "amount": MakePaymentResponse.get_amount_decimal,
+        "amount_pay": MakePaymentResponse.get_amount_pay_decimal,
+        "currency": MakePaymentResponse.get_currency,
+        "system": MakePaymentResponse.get_system,
+        "number": MakePaymentResponse.get_number,
+        "shop_commission_amount": MakePaymentResponse.get_shop_commission_amount_decimal,
+        "paid_commission": MakePaymentResponse.get_paid_commission,
+    },
+}
+
+
+def get_columns(response_class: type, columns: Iterable[str] = None) -> Dict[str, Callable]:
+    for klass in response_class.__mro__:
+        if klass in COLUMNS:
+            getters = COLUMNS[klass]
+            break
+    else:
+        raise TypeError("Can't export %s" % response_class.__name__)
+
+    if columns is None:
+        return dict(getters)
+
+    unknown = [name for name in columns if name not in getters]
+    if unknown:
+        raise KeyError("Unknown columns: " + ", ".join(unknown))
+
+    return {name: getters[name] for name in columns}
+
+
+def to_columns(responses: Iterable[Response], columns: Iterable[str] = None,
+               skip_errors: bool = True) -> Dict[str, list]:
+    response_class = None
+    getters = {}
+    result = {}
+
+    for response in responses:
+        if skip_errors and response.has_error():
+            continue
+
+        if response_class is None:
+            response_class = type(response)
+            getters = get_columns(response_class, columns)
+            result = {name: [] for name in getters}
+        elif type(response) is not response_class:
+            raise TypeError("Can't mix %s and %s" % (response_class.__name__, type(response).__name__))
+
+        for name, getter in getters.items():
+            try:
+                value = getter(response)
+            except (KeyError, TypeError, ValueError, InvalidOperation):
+                value = None
+            result[name].append(value)
+
+    return result
+
+
+def to_records(responses: Iterable[Response], columns: Iterable[str] = None,
+               skip_errors: bool = True) -> 'numpy.recarray':
+    if numpy is None:
+        raise ImportError("to_records requires numpy, install paykassa-api-sdk[analytics]")
+
+    data = to_columns(responses, columns, skip_errors)
+    if not data:
+        return numpy.recarray(0, dtype=[])
+
+    return numpy.rec.fromarrays([_to_array(values) for values in data.values()], names=list(data))
+
+
+def to_dataframe(responses: Iterable[Response], columns: Iterable[str] = None,
+                 skip_errors: bool = True) -> 'pandas.DataFrame':
+    if pandas is None or numpy is None:
+        raise ImportError("to_dataframe requires pandas, install paykassa-api-sdk[analytics]")
+
+    data = to_columns(responses, columns, skip_errors)
+    frame = pandas.DataFrame({name: _to_array(values) for name, values in data.items()})
+
+    for name, values in data.items():
+        if isinstance(_get_sample(values), Enum):
+            frame[name] = frame[name].astype("category")
+
+    return frame
+
+
+def _get_sample(values: list):
+    return next((value for value in values if value is not None), None)
+
+
+def _to_array(values: list) -> 'numpy.ndarray':
+    sample = _get_sample(values)
+    has_missing = any(value is None for value in values)
+
+    if isinstance(sample, bool):
+        return numpy.array(values, dtype=object if has_missing else bool)
+
+    if isinstance(sample, Decimal):
+        return numpy.array([numpy.nan if value is None else float(value) for value in values], dtype=numpy.float64)
+
+    if isinstance(sample, int):
+        if has_missing:
+            return numpy.array([numpy.nan if value is None else value for value in values], dtype=numpy.float64)
+        return numpy.array(values, dtype=numpy.int64)
+
+    if isinstance(sample, Enum):
+        return numpy.array(["" if value is None else value.name for value in values], dtype=str)
+
+    if isinstance(sample, str):
+        return numpy.array(["" if value is None else value for value in values], dtype=str)
+
+    return numpy.array(values, dtype=object)
@@ -0,0 +1,81 @@
+from enum import Enum
+from urllib.parse import quote_plus
+
+CONTENT_TYPE = "application/x-www-form-urlencoded"
+
+HEADERS = {"Content-Type": CONTENT_TYPE}
+
+CONSTANT_FIELDS = {
+    "sci_create_order_get_data": {"phone": False},
+    "sci_create_order": {"phone": False},
+}
+
+
+def encode_value(value) -> str:
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return str(value.value)
+
+    return str(value)
+
+
+def encode_fields(fields: dict) -> str:
+    pairs = []
+    for name, value in fields.items():
+        key = quote_plus(name)
+        if isinstance(value, (list, tuple)):
+            pairs.extend(key + "=" + quote_plus(encode_value(item)) for item in value)
+        else:
+            pairs.append(key + "=" + quote_plus(encode_value(value)))
+
+    return "&".join(pairs)
+
+
+def encode(data: dict) -> bytes:
+    if isinstance(data, FormData):
+        return data.encode()
+
+    return encode_fields(data).encode()
+
+
+class RequestTemplate(object):
+    def __init__(self, fields: dict, constants: dict = None):
+        self._fields = dict(fields)
+        self._static = dict(constants or {}, **fields)
+        self._prefix = encode_fields(self._static).encode()
+
+    def fill(self, request: dict) -> 'FormData':
+        data = FormData(self, request)
+        data.update(self._fields)
+        return data
+
+    def encode(self, data: dict) -> bytes:
+        static = self._static
+        variable = {}
+        for name, value in data.items():
+            if name not in static:
+                variable[name] = value
+            elif static[name] != value:
+                # e.g. a rotated key, the prefix would still carry the old one
+                return encode_fields(data).encode()
+
+        if not variable:
+            return self._prefix
+
+        return self._prefix + b"&" + encode_fields(variable).encode()
+
+
+class FormData(dict):
+    __slots__ = ("_template",)
+
+    def __init__(self, template: RequestTemplate, fields: dict):
+        super(FormData, self).__init__(fields)
+        self._template = template
+
+    def encode(self) -> bytes:
+        return self._template.encode(self)
@@ -0,0 +1,163 @@
+import asyncio
+import contextvars
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Awaitable, Iterable, Tuple
+
+from paykassa.middleware import Middleware, Call, Proceed, AsyncProceed
+from paykassa.retry import IDEMPOTENT_ENDPOINTS
+
+
+class HedgePolicy(Middleware):
+    def __init__(self, percentile: float = 95.0, initial_delay: float = 0.5, min_delay: float = 0.01,
+                 window: int = 200, endpoints: Iterable[str] = None, max_workers: int = 32,
+                 max_primary_workers: int = 32):
+        endpoints = frozenset(endpoints) if endpoints is not None else IDEMPOTENT_ENDPOINTS
+        if not endpoints <= IDEMPOTENT_ENDPOINTS:
+            raise ValueError("Only read-only endpoints can be hedged: %s" % ", ".join(sorted(IDEMPOTENT_ENDPOINTS)))
+
+        self._percentile = percentile
+        self._initial_delay = initial_delay
+        self._min_delay = min_delay
+        self._window = window
+        self._endpoints = endpoints
+        self._max_workers = max_workers
+        self._max_primary_workers = max_primary_workers
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._executor = None
+        self._primary_executor = None
+
+    def is_hedged(self, endpoint: str) -> bool:
+        return endpoint in self._endpoints and endpoint in IDEMPOTENT_ENDPOINTS
+
+    # every attempt runs on its own copy of the call, so a late loser can't overwrite what the winner reported
+    def handle(self, call: Call, proceed: Proceed) -> dict:
+        return call_hedged(call.endpoint, lambda: proceed(call.copy()), self)
+
+    async def handle_async(self, call: Call, proceed: AsyncProceed) -> dict:
+        return await call_hedged_async(call.endpoint, lambda: proceed(call.copy()), self)
+
+    def get_delay(self, endpoint: str) -> float:
+        with self._lock:
+            latencies = sorted(self._latencies.get(endpoint, ()))
+
+        if not latencies:
+            return self._initial_delay
+
+        index = min(len(latencies) - 1, int(len(latencies) * self._percentile / 100))
+        return max(self._min_delay, latencies[index])
+
+    def record(self, endpoint: str, latency: float):
+        with self._lock:
+            if endpoint not in self._latencies:
+                self._latencies[endpoint] = deque(maxlen=self._window)
+            self._latencies[endpoint].append(latency)
+
+    def get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers,
+                                                    thread_name_prefix="paykassa-hedge")
+            return self._executor
+
+    def get_primary_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._primary_executor is None:
+                self._primary_executor = ThreadPoolExecutor(max_workers=self._max_primary_workers,
+                                                            thread_name_prefix="paykassa-primary")
+            return self._primary_executor
+
+    def close(self):
+        with self._lock:
+            for executor in (self._executor, self._primary_executor):
+                if executor is not None:
+                    executor.shutdown(wait=False)
+            self._executor = None
+            self._primary_executor = None
+
+
+def call_hedged(endpoint: str, send: Callable[[], dict], hedge_policy: HedgePolicy = None) -> dict:
+    if hedge_policy is None or not hedge_policy.is_hedged(endpoint):
+        return send()
+
+    # the caller only waits; primaries and hedges have separate pools, so a burst of slow primaries can't take
+    # the threads their own hedges need
+    results = queue.Queue()
+    hedge_policy.get_primary_executor().submit(contextvars.copy_context().run, _attempt, send, results)
+    attempts = 1
+    hedge = None
+
+    try:
+        outcome = results.get(timeout=hedge_policy.get_delay(endpoint))
+    except queue.Empty:
+        hedge = hedge_policy.get_executor().submit(contextvars.copy_context().run, _attempt, send, results)
+        attempts += 1
+        outcome = results.get()
+
+    while True:
+        response, error, elapsed = outcome
+        attempts -= 1
+
+        if error is None:
+            # a request already on the wire can't be stopped, its answer is just dropped
+            if hedge is not None:
+                hedge.cancel()
+
+            hedge_policy.record(endpoint, elapsed)
+            return response
+
+        if attempts == 0:
+            raise error
+
+        outcome = results.get()
+
+
+async def call_hedged_async(endpoint: str, send: Callable[[], Awaitable[dict]],
+                            hedge_policy: HedgePolicy = None) -> dict:
+    if hedge_policy is None or not hedge_policy.is_hedged(endpoint):
+        return await send()
+
+    pending = {asyncio.ensure_future(_attempt_async(send))}
+    done, _ = await asyncio.wait(pending, timeout=hedge_policy.get_delay(endpoint))
+    if not done:
+        pending.add(asyncio.ensure_future(_attempt_async(send)))
+
+    error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                if task.exception() is not None:
+                    error = task.exception()
+                    continue
+
+                response, elapsed = task.result()
+                hedge_policy.record(endpoint, elapsed)
+                return response
+    finally:
+        for loser in pending:
+            loser.cancel()
+
+    raise error
+
+
+def _attempt(send: Callable[[], dict], results: queue.Queue):
+    started = time.monotonic()
+    try:
+        response = send()
+    except Exception as e:
+        results.put((None, e, None))
+        return
+
+    # only the attempt's own time is recorded, the wait before a hedge would push the percentile up
+    results.put((response, None, time.monotonic() - started))
+
+
+async def _attempt_async(send: Callable[[], Awaitable[dict]]) -> Tuple[dict, float]:
+    started = time.monotonic()
+    return await send(), time.monotonic() - started
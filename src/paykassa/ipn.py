@@ -0,0 +1,375 @@
+import asyncio
+import heapq
+import inspect
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Any, Optional
+from urllib.parse import parse_qs
+
+from paykassa.async_merchant import AsyncMerchantApi
+from paykassa.dto import CheckPaymentRequest, CheckTransactionRequest, Response
+from paykassa.merchant import MerchantApi
+from paykassa.struct import ErrorType
+
+logger = logging.getLogger(__name__)
+
+Callback = Callable[[Response], Any]
+ErrorCallback = Callable[[str, Response], Any]
+Ack = Callable[[dict], str]
+
+TRANSIENT_ERRORS = frozenset({ErrorType.TRANSPORT, ErrorType.TIMEOUT, ErrorType.RATE_LIMITED, ErrorType.CIRCUIT_OPEN})
+
+_STOP = object()
+
+
+def get_ack(form: dict) -> str:
+    return form["order_id"] + "|success" if form.get("order_id") else "OK"
+
+
+def parse_form(body: bytes) -> dict:
+    return {name: values[-1] for name, values in parse_qs(body.decode("utf-8", "replace")).items()}
+
+
+def is_transient(response: Response) -> bool:
+    return response.has_error() and response.get_error_type() in TRANSIENT_ERRORS
+
+
+def get_retry_delay(attempt: int, retry_delay: float, max_retry_delay: float) -> float:
+    return min(max_retry_delay, retry_delay * 2 ** (attempt - 1))
+
+
+class IpnReceiver(object):
+    def __init__(self, client: MerchantApi, callback: Callback, transaction: bool = False, workers: int = 4,
+                 max_pending: int = 1000, max_attempts: int = 5, retry_delay: float = 1.0,
+                 max_retry_delay: float = 60.0, max_body_size: int = 4096):
+        self._client = client
+        self._callback = callback
+        self._transaction = transaction
+        self._max_body_size = max_body_size
+        self._max_attempts = max_attempts
+        self._retry_delay = retry_delay
+        self._max_retry_delay = max_retry_delay
+        self._error_callback = None
+        self._ack = get_ack
+        self._test = False
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._in_flight = set()
+        self._retries = []
+        self._closed = False
+        self._queue = queue.Queue(max_pending)
+        self._threads = [threading.Thread(target=self.__work, name="paykassa-ipn", daemon=True)
+                         for _ in range(workers)]
+        self._retry_thread = threading.Thread(target=self.__retry, name="paykassa-ipn-retry", daemon=True)
+
+        for thread in self._threads + [self._retry_thread]:
+            thread.start()
+
+    def set_error_callback(self, error_callback: ErrorCallback = None) -> 'IpnReceiver':
+        self._error_callback = error_callback
+        return self
+
+    def set_ack(self, ack: Ack) -> 'IpnReceiver':
+        self._ack = ack
+        return self
+
+    def set_test(self, test: bool) -> 'IpnReceiver':
+        self._test = test
+        return self
+
+    def submit(self, private_hash: str) -> bool:
+        with self._lock:
+            if private_hash in self._in_flight:
+                return True
+
+            try:
+                self._queue.put_nowait((private_hash, 1))
+            except queue.Full:
+                return False
+
+            self._in_flight.add(private_hash)
+            return True
+
+    def join(self):
+        with self._condition:
+            while self._in_flight:
+                self._condition.wait()
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads + [self._retry_thread]:
+            thread.join()
+
+        with self._condition:
+            self._retries = []
+            self._in_flight.clear()
+            self._condition.notify_all()
+
+    def __call__(self, environ: dict, start_response):
+        if environ["REQUEST_METHOD"] != "POST":
+            return IpnReceiver.__respond(start_response, "405 Method Not Allowed", "Method Not Allowed")
+
+        try:
+            length = int(environ.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            return IpnReceiver.__respond(start_response, "400 Bad Request", "Invalid Content-Length")
+
+        if length > self._max_body_size:
+            return IpnReceiver.__respond(start_response, "413 Payload Too Large", "Payload Too Large")
+
+        form = parse_form(environ["wsgi.input"].read(length) if length > 0 else b"")
+
+        if not form.get("private_hash"):
+            return IpnReceiver.__respond(start_response, "400 Bad Request", "private_hash is required")
+
+        if not self.submit(form["private_hash"]):
+            return IpnReceiver.__respond(start_response, "503 Service Unavailable", "Try again later")
+
+        return IpnReceiver.__respond(start_response, "200 OK", self._ack(form))
+
+    def __work(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                self.__verify(*item)
+            finally:
+                self._queue.task_done()
+
+    def __retry(self):
+        with self._condition:
+            while not self._closed:
+                now = time.monotonic()
+                while self._retries and self._retries[0][0] <= now:
+                    _, private_hash, attempt = heapq.heappop(self._retries)
+                    try:
+                        self._queue.put_nowait((private_hash, attempt))
+                    except queue.Full:
+                        heapq.heappush(self._retries, (now + self._retry_delay, private_hash, attempt))
+
+                self._condition.wait(self._retries[0][0] - now if self._retries else None)
+
+    def __verify(self, private_hash: str, attempt: int):
+        retry = False
+
+        try:
+            if self._transaction:
+                response = self._client.check_transaction(CheckTransactionRequest()
+                                                          .set_private_hash(private_hash)
+                                                          .set_test(self._test))
+            else:
+                response = self._client.check_payment(CheckPaymentRequest()
+                                                      .set_private_hash(private_hash)
+                                                      .set_test(self._test))
+
+            # Paykassa got its answer already and won't deliver the notification again, so it's retried here
+            retry = is_transient(response) and attempt < self._max_attempts
+            if retry:
+                logger.warning("Failed to verify the IPN %s, attempt %d: %s", private_hash, attempt,
+                               response.get_message())
+            elif not response.has_error():
+                self._callback(response)
+            elif self._error_callback is not None:
+                self._error_callback(private_hash, response)
+        except Exception:
+            logger.exception("Failed to process the IPN %s", private_hash)
+        finally:
+            with self._condition:
+                if retry and not self._closed:
+                    delay = get_retry_delay(attempt, self._retry_delay, self._max_retry_delay)
+                    heapq.heappush(self._retries, (time.monotonic() + delay, private_hash, attempt + 1))
+                else:
+                    self._in_flight.discard(private_hash)
+                self._condition.notify_all()
+
+    @staticmethod
+    def __respond(start_response, status: str, body: str) -> list:
+        encoded = body.encode()
+        start_response(status, [("Content-Type", "text/plain"), ("Content-Length", str(len(encoded)))])
+        return [encoded]
+
+
+class AsyncIpnReceiver(object):
+    def __init__(self, client: AsyncMerchantApi, callback: Callback, transaction: bool = False, workers: int = 4,
+                 max_pending: int = 1000, max_attempts: int = 5, retry_delay: float = 1.0,
+                 max_retry_delay: float = 60.0, max_body_size: int = 4096):
+        self._client = client
+        self._callback = callback
+        self._transaction = transaction
+        self._max_body_size = max_body_size
+        self._workers = workers
+        self._max_pending = max_pending
+        self._max_attempts = max_attempts
+        self._retry_delay = retry_delay
+        self._max_retry_delay = max_retry_delay
+        self._error_callback = None
+        self._ack = get_ack
+        self._test = False
+        self._in_flight = set()
+        self._queue = None
+        self._idle = None
+        self._tasks = []
+        self._retry_tasks = set()
+
+    def set_error_callback(self, error_callback: ErrorCallback = None) -> 'AsyncIpnReceiver':
+        self._error_callback = error_callback
+        return self
+
+    def set_ack(self, ack: Ack) -> 'AsyncIpnReceiver':
+        self._ack = ack
+        return self
+
+    def set_test(self, test: bool) -> 'AsyncIpnReceiver':
+        self._test = test
+        return self
+
+    def submit(self, private_hash: str) -> bool:
+        if private_hash in self._in_flight:
+            return True
+
+        try:
+            self.__get_queue().put_nowait((private_hash, 1))
+        except asyncio.QueueFull:
+            return False
+
+        self._in_flight.add(private_hash)
+        self._idle.clear()
+        return True
+
+    async def join(self):
+        if self._idle is not None:
+            await self._idle.wait()
+
+    async def close(self):
+        tasks = self._tasks + list(self._retry_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._retry_tasks = set()
+        self._in_flight.clear()
+        self._queue = None
+        if self._idle is not None:
+            self._idle.set()
+            self._idle = None
+
+    async def __call__(self, scope: dict, receive, send):
+        if scope["type"] == "lifespan":
+            return await self.__lifespan(receive, send)
+
+        if scope["method"] != "POST":
+            return await AsyncIpnReceiver.__respond(send, 405, "Method Not Allowed")
+
+        body = await AsyncIpnReceiver.__read_body(receive, self._max_body_size)
+        if body is None:
+            return await AsyncIpnReceiver.__respond(send, 413, "Payload Too Large")
+
+        form = parse_form(body)
+
+        if not form.get("private_hash"):
+            return await AsyncIpnReceiver.__respond(send, 400, "private_hash is required")
+
+        if not self.submit(form["private_hash"]):
+            return await AsyncIpnReceiver.__respond(send, 503, "Try again later")
+
+        await AsyncIpnReceiver.__respond(send, 200, self._ack(form))
+
+    def __get_queue(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(self._max_pending)
+            self._idle = asyncio.Event()
+            self._idle.set()
+            self._tasks = [asyncio.ensure_future(self.__work()) for _ in range(self._workers)]
+
+        return self._queue
+
+    async def __work(self):
+        while True:
+            item = await self._queue.get()
+            try:
+                await self.__verify(*item)
+            finally:
+                self._queue.task_done()
+
+    async def __retry(self, private_hash: str, attempt: int, delay: float):
+        await asyncio.sleep(delay)
+        await self._queue.put((private_hash, attempt))
+
+    async def __verify(self, private_hash: str, attempt: int):
+        retry = False
+
+        try:
+            if self._transaction:
+                response = await self._client.check_transaction(CheckTransactionRequest()
+                                                                .set_private_hash(private_hash)
+                                                                .set_test(self._test))
+            else:
+                response = await self._client.check_payment(CheckPaymentRequest()
+                                                            .set_private_hash(private_hash)
+                                                            .set_test(self._test))
+
+            retry = is_transient(response) and attempt < self._max_attempts
+            if retry:
+                logger.warning("Failed to verify the IPN %s, attempt %d: %s", private_hash, attempt,
+                               response.get_message())
+            elif not response.has_error():
+                await AsyncIpnReceiver.__call(self._callback, response)
+            elif self._error_callback is not None:
+                await AsyncIpnReceiver.__call(self._error_callback, private_hash, response)
+        except Exception:
+            logger.exception("Failed to process the IPN %s", private_hash)
+        finally:
+            if retry:
+                delay = get_retry_delay(attempt, self._retry_delay, self._max_retry_delay)
+                task = asyncio.ensure_future(self.__retry(private_hash, attempt + 1, delay))
+                self._retry_tasks.add(task)
+                task.add_done_callback(self._retry_tasks.discard)
+            else:
+                self._in_flight.discard(private_hash)
+                if not self._in_flight:
+                    self._idle.set()
+
+    async def __lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    @staticmethod
+    async def __call(callback: Callable, *args):
+        result = callback(*args)
+        if inspect.isawaitable(result):
+            await result
+
+    @staticmethod
+    async def __read_body(receive, max_body_size: int) -> Optional[bytes]:
+        body = bytearray()
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if len(body) > max_body_size:
+                return None
+            if not message.get("more_body", False):
+                return bytes(body)
+
+    @staticmethod
+    async def __respond(send, status: int, body: str):
+        encoded = body.encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"text/plain"), (b"content-length", str(len(encoded)).encode())],
+        })
+        await send({"type": "http.response.body", "body": encoded})
@@ -1,28 +1,31 @@
-import requests
-
 from paykassa.dto import CheckPaymentRequest, CheckPaymentResponse, CheckTransactionRequest, CheckTransactionResponse, \
     GenerateAddressRequest, GenerateAddressResponse, GetPaymentUrlRequest, GetPaymentUrlResponse
+from paykassa.cache import TtlCache
+from paykassa.client import ClientBase
+from paykassa.error import RequestTimeout, get_error_response
+from paykassa.transport import Transport, deadline
 
 
 class MerchantApiInterface(object):
-    def check_payment(self, request: CheckPaymentRequest) -> CheckPaymentResponse:
+    def check_payment(self, request: CheckPaymentRequest, timeout: float = None) -> CheckPaymentResponse:
         pass
 
-    def check_transaction(self, request: CheckTransactionRequest) -> CheckTransactionResponse:
+    def check_transaction(self, request: CheckTransactionRequest, timeout: float = None) -> CheckTransactionResponse:
         pass
 
-    def generate_address(self, request: GenerateAddressRequest) -> GenerateAddressResponse:
+    def generate_address(self, request: GenerateAddressRequest, timeout: float = None) -> GenerateAddressResponse:
         pass
 
-    def get_payment_url(self, request: GetPaymentUrlRequest) -> GetPaymentUrlResponse:
+    def get_payment_url(self, request: GetPaymentUrlRequest, timeout: float = None) -> GetPaymentUrlResponse:
         pass
 
 
-class MerchantApiBase(MerchantApiInterface):
+class MerchantApiBase(ClientBase, MerchantApiInterface):
     BASE_URL = "https://paykassa.app/sci/"
     API_VERSION = 0.4
 
-    def __init__(self, api_id: str, api_key: str):
+    def __init__(self, api_id: str, api_key: str, transport: Transport = None):
+        super(MerchantApiBase, self).__init__(transport)
         self._sci_id = api_id
         self._sci_key = api_key
 
@@ -34,46 +37,51 @@ class MerchantApiBase(MerchantApiInterface):
         self._sci_key = api_key
         return self
 
-    def _make_request(self, endpoint: str, request: dict) -> dict:
-        try:
-            self.__set_method_data(endpoint, request)
-            return requests.post(self.__get_api_url(), request).json()
-        except Exception as e:
-            return MerchantApiBase.__get_error_response(e)
-
-    def __get_api_url(self):
-        return self.BASE_URL + str(self.API_VERSION) + "/index.php"
-
-    def __set_method_data(self, endpoint: str, request: dict):
-        request["func"] = endpoint
-        request["sci_id"] = self._sci_id
-        request["sci_key"] = self._sci_key
-
-    @staticmethod
-    def __get_error_response(e: Exception) -> dict:
-        return {
-            "error": True,
-            "message": str(e),
-            "data": {},
-        }
+    def _get_credentials(self) -> dict:
+        return {"sci_id": self._sci_id, "sci_key": self._sci_key}
 
 
 class MerchantApi(MerchantApiBase):
-    def __init__(self, sci_id: str, sci_key: str):
-        super(MerchantApi, self).__init__(sci_id, sci_key)
+    def __init__(self, sci_id: str, sci_key: str, transport: Transport = None):
+        super(MerchantApi, self).__init__(sci_id, sci_key, transport)
+        self._verification_cache = None
+
+    def set_verification_cache(self, ttl: float = None, max_size: int = 10000) -> 'MerchantApi':
+        self._verification_cache = TtlCache(ttl, max_size) if ttl else None
+        return self
 
     # see https://paykassa.pro/docs/#api-SCI-sci_confirm_order
-    def check_payment(self, request: CheckPaymentRequest) -> CheckPaymentResponse:
-        return CheckPaymentResponse(self._make_request("sci_confirm_order", request.normalize()))
+    def check_payment(self, request: CheckPaymentRequest, timeout: float = None) -> CheckPaymentResponse:
+        with deadline(timeout):
+            return self.__verify("sci_confirm_order", request.normalize(), CheckPaymentResponse,
+                                 lambda response: not response.has_error())
 
     # see https://paykassa.pro/docs/#api-SCI-sci_confirm_transaction_notification
-    def check_transaction(self, request: CheckTransactionRequest) -> CheckTransactionResponse:
-        return CheckTransactionResponse(self._make_request("sci_confirm_transaction_notification", request.normalize()))
+    def check_transaction(self, request: CheckTransactionRequest, timeout: float = None) -> CheckTransactionResponse:
+        with deadline(timeout):
+            return self.__verify("sci_confirm_transaction_notification", request.normalize(),
+                                 CheckTransactionResponse,
+                                 lambda response: not response.has_error() and response.get_status() == "yes")
 
     # see https://paykassa.pro/docs/#api-SCI-sci_create_order_get_data
-    def generate_address(self, request: GenerateAddressRequest) -> GenerateAddressResponse:
-        return GenerateAddressResponse(self._make_request("sci_create_order_get_data", request.normalize()))
+    def generate_address(self, request: GenerateAddressRequest, timeout: float = None) -> GenerateAddressResponse:
+        with deadline(timeout):
+            return GenerateAddressResponse(self._make_request("sci_create_order_get_data", request.normalize()))
 
     # see https://paykassa.pro/docs/#api-SCI-sci_create_order
-    def get_payment_url(self, request: GetPaymentUrlRequest) -> GetPaymentUrlResponse:
-        return GetPaymentUrlResponse(self._make_request("sci_create_order", request.normalize()))
+    def get_payment_url(self, request: GetPaymentUrlRequest, timeout: float = None) -> GetPaymentUrlResponse:
+        with deadline(timeout):
+            return GetPaymentUrlResponse(self._make_request("sci_create_order", request.normalize()))
+
+    def __verify(self, endpoint: str, data: dict, response_class, is_final):
+        if self._verification_cache is None:
+            return response_class(self._make_request(endpoint, data))
+
+        try:
+            return self._verification_cache.get_or_load(
+                (endpoint, data["private_hash"]),
+                lambda: response_class(self._make_request(endpoint, data)),
+                is_final,
+            )
+        except RequestTimeout as e:
+            return response_class(get_error_response(e))
@@ -0,0 +1,77 @@
+import time
+from typing import Callable, Awaitable, List
+
+Proceed = Callable[['Call'], dict]
+AsyncProceed = Callable[['Call'], Awaitable[dict]]
+
+
+class Call(object):
+    def __init__(self, endpoint: str, request: dict, url: str, credential: str):
+        self.endpoint = endpoint
+        self.request = request
+        self.url = url
+        self.credential = credential
+        self.started_at = time.monotonic()
+        self.elapsed = None
+        self.response = None
+        self.exception = None
+
+    def copy(self) -> 'Call':
+        return Call(self.endpoint, self.request, self.url, self.credential)
+
+
+class Middleware(object):
+    def handle(self, call: Call, proceed: Proceed) -> dict:
+        return proceed(call)
+
+    async def handle_async(self, call: Call, proceed: AsyncProceed) -> dict:
+        return await proceed(call)
+
+
+class Pipeline(object):
+    def __init__(self, middlewares: List[Middleware], terminal: Proceed):
+        self._middlewares = middlewares
+        self._terminal = terminal
+
+    def run(self, call: Call) -> dict:
+        return self.__proceed(0, call)
+
+    def __proceed(self, index: int, call: Call) -> dict:
+        try:
+            if index == len(self._middlewares):
+                call.response = self._terminal(call)
+            else:
+                call.response = self._middlewares[index].handle(call, lambda c: self.__proceed(index + 1, c))
+            call.exception = None
+            return call.response
+        except Exception as e:
+            call.response = None
+            call.exception = e
+            raise
+        finally:
+            call.elapsed = time.monotonic() - call.started_at
+
+
+class AsyncPipeline(object):
+    def __init__(self, middlewares: List[Middleware], terminal: AsyncProceed):
+        self._middlewares = middlewares
+        self._terminal = terminal
+
+    async def run(self, call: Call) -> dict:
+        return await self.__proceed(0, call)
+
+    async def __proceed(self, index: int, call: Call) -> dict:
+        try:
+            if index == len(self._middlewares):
+                call.response = await self._terminal(call)
+            else:
+                call.response = await self._middlewares[index].handle_async(call,
+                                                                           lambda c: self.__proceed(index + 1, c))
+            call.exception = None
+            return call.response
+        except Exception as e:
+            call.response = None
+            call.exception = e
+            raise
+        finally:
+            call.elapsed = time.monotonic() - call.started_at
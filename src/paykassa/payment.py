@@ -1,27 +1,35 @@
-import requests
+import time
+from typing import Iterable, Iterator, Tuple, List
 
 from paykassa.dto import CheckBalanceRequest, CheckBalanceResponse, \
     MakePaymentRequest, MakePaymentResponse, \
     GetTxidsOfInvoicesResponse, \
     GetTxidsOfInvoicesRequest
+from paykassa.batch import run_batch
+from paykassa.cache import TtlCache
+from paykassa.client import ClientBase
+from paykassa.error import ApiError, RequestTimeout, get_error_response
+from paykassa.transport import Transport, deadline
 
 
 class PaymentApiInterface(object):
-    def check_balance(self, request: CheckBalanceRequest) -> CheckBalanceResponse:
+    def check_balance(self, request: CheckBalanceRequest, timeout: float = None) -> CheckBalanceResponse:
         pass
 
-    def make_payment(self, request: MakePaymentRequest) -> MakePaymentResponse:
+    def make_payment(self, request: MakePaymentRequest, timeout: float = None) -> MakePaymentResponse:
         pass
 
-    def get_txids_by_invoices(self, request: GetTxidsOfInvoicesRequest) -> GetTxidsOfInvoicesResponse:
+    def get_txids_by_invoices(self, request: GetTxidsOfInvoicesRequest,
+                              timeout: float = None) -> GetTxidsOfInvoicesResponse:
         pass
 
 
-class PaymentApiBase(PaymentApiInterface):
+class PaymentApiBase(ClientBase, PaymentApiInterface):
     BASE_URL = "https://paykassa.app/api/"
     API_VERSION = 0.9
 
-    def __init__(self, api_id: int, api_key: str):
+    def __init__(self, api_id: int, api_key: str, transport: Transport = None):
+        super(PaymentApiBase, self).__init__(transport)
         self._api_id = api_id
         self._api_key = api_key
 
@@ -33,42 +41,115 @@ class PaymentApiBase(PaymentApiInterface):
         self._api_key = api_key
         return self
 
-    def _make_request(self, endpoint: str, request: dict) -> dict:
-        try:
-            self.__set_method_data(endpoint, request)
-            return requests.post(self.__get_api_url(), request).json()
-        except Exception as e:
-            return PaymentApiBase.__get_error_response(e)
-
-    @staticmethod
-    def __get_error_response(e: Exception) -> dict:
-        return {
-            "error": True,
-            "message": str(e),
-            "data": {},
-        }
-
-    def __get_api_url(self):
-        return self.BASE_URL + str(self.API_VERSION) + "/index.php"
-
-    def __set_method_data(self, endpoint: str, request: dict):
-        request["func"] = endpoint
-        request["api_id"] = self._api_id
-        request["api_key"] = self._api_key
+    def _get_credentials(self) -> dict:
+        return {"api_id": self._api_id, "api_key": self._api_key}
 
 
 class PaymentApi(PaymentApiBase):
-    def __init__(self, api_id: int, api_key: str):
-        super(PaymentApi, self).__init__(api_id, api_key)
+    def __init__(self, api_id: int, api_key: str, transport: Transport = None):
+        super(PaymentApi, self).__init__(api_id, api_key, transport)
+        self._balance_cache = None
+        self._invoices_chunk_size = None
+        self._invoices_concurrency = 1
+
+    def set_balance_cache_ttl(self, ttl: float = None) -> 'PaymentApi':
+        self._balance_cache = TtlCache(ttl) if ttl else None
+        return self
+
+    def set_invoices_chunk_size(self, chunk_size: int = None, concurrency: int = 4) -> 'PaymentApi':
+        self._invoices_chunk_size = chunk_size
+        self._invoices_concurrency = concurrency
+        return self
 
     # see https://paykassa.pro/docs/#api-API-api_get_shop_balance
-    def check_balance(self, request: CheckBalanceRequest) -> CheckBalanceResponse:
-        return CheckBalanceResponse(self._make_request("api_get_shop_balance", request.normalize()))
+    def check_balance(self, request: CheckBalanceRequest, timeout: float = None) -> CheckBalanceResponse:
+        data = request.normalize()
+
+        with deadline(timeout):
+            if self._balance_cache is None:
+                return CheckBalanceResponse(self._make_request("api_get_shop_balance", data))
+
+            try:
+                return self._balance_cache.get_or_load(
+                    data["shop_id"],
+                    lambda: CheckBalanceResponse(self._make_request("api_get_shop_balance", data)),
+                    lambda response: not response.has_error(),
+                )
+            except RequestTimeout as e:
+                return CheckBalanceResponse(get_error_response(e))
 
     # see https://paykassa.pro/docs/#api-API-api_payment
-    def make_payment(self, request: MakePaymentRequest) -> MakePaymentResponse:
-        return MakePaymentResponse(self._make_request('api_payment', request.normalize()))
+    def make_payment(self, request: MakePaymentRequest, timeout: float = None) -> MakePaymentResponse:
+        data = request.normalize()
+
+        try:
+            with deadline(timeout):
+                return MakePaymentResponse(self._make_request('api_payment', data))
+        finally:
+            # a failed or timed out payout may still have been debited, so drop the balance either way
+            if self._balance_cache is not None:
+                self._balance_cache.invalidate(data["shop_id"])
 
     # see https://paykassa.pro/docs/#api-API-api_get_shop_txids
-    def get_txids_by_invoices(self, request: GetTxidsOfInvoicesRequest) -> GetTxidsOfInvoicesResponse:
-        return GetTxidsOfInvoicesResponse(self._make_request('api_get_shop_txids', request.normalize()))
+    def get_txids_by_invoices(self, request: GetTxidsOfInvoicesRequest,
+                              timeout: float = None) -> GetTxidsOfInvoicesResponse:
+        data = request.normalize()
+        chunks = self.__split_invoices(data)
+
+        with deadline(timeout):
+            if len(chunks) < 2:
+                return GetTxidsOfInvoicesResponse(self._make_request('api_get_shop_txids', data))
+
+            message = ""
+            txids = {}
+            for _, response in self.__get_txids_of_chunks(data["shop_id"], chunks):
+                if response.has_error():
+                    return response
+
+                message = response.get_message()
+                txids.update(response.get_all_txids())
+
+        return GetTxidsOfInvoicesResponse({
+            "error": False,
+            "message": message,
+            "data": txids,
+        })
+
+    def iter_txids_by_invoices(self, request: GetTxidsOfInvoicesRequest,
+                               timeout: float = None) -> Iterator[Tuple[str, List[str]]]:
+        data = request.normalize()
+        # the deadline only covers the chunk requests, the caller's loop body runs between the yields without it
+        expires_at = time.monotonic() + timeout if timeout is not None else None
+
+        for _, response in self.__get_txids_of_chunks(data["shop_id"], self.__split_invoices(data), expires_at):
+            if response.has_error():
+                raise ApiError(response)
+
+            for invoice_id, txids in response.get_all_txids().items():
+                yield invoice_id, txids
+
+    def make_payments(self, requests: Iterable[MakePaymentRequest], concurrency: int = 8, ordered: bool = True,
+                      timeout: float = None) -> Iterator[Tuple[MakePaymentRequest, MakePaymentResponse]]:
+        return run_batch(lambda request: self.make_payment(request, timeout), requests, concurrency, ordered,
+                         PaymentApi.__get_failed_payment)
+
+    @staticmethod
+    def __get_failed_payment(e: Exception) -> MakePaymentResponse:
+        return MakePaymentResponse(get_error_response(e))
+
+    def __split_invoices(self, data: dict) -> List[list]:
+        invoices = list(data["invoices[]"])
+        size = self._invoices_chunk_size or len(invoices) or 1
+
+        return [invoices[i:i + size] for i in range(0, len(invoices), size)]
+
+    def __get_txids_of_chunks(self, shop_id: str, chunks: List[list], expires_at: float = None) \
+            -> Iterator[Tuple[list, GetTxidsOfInvoicesResponse]]:
+        def get_txids(chunk: list) -> GetTxidsOfInvoicesResponse:
+            with deadline(expires_at - time.monotonic() if expires_at is not None else None):
+                return GetTxidsOfInvoicesResponse(self._make_request('api_get_shop_txids', GetTxidsOfInvoicesRequest()
+                                                                     .set_shop_id(shop_id)
+                                                                     .set_invoices(chunk)
+                                                                     .normalize()))
+
+        return run_batch(get_txids, chunks, self._invoices_concurrency, False)
@@ -0,0 +1,265 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable, Iterable, List, Tuple
+
+from paykassa.dto import GenerateAddressRequest, GenerateAddressResponse
+from paykassa.merchant import MerchantApiInterface
+from paykassa.struct import System, Currency, SYSTEMS_BY_CODE, CURRENCIES_BY_VALUE, validate_pair
+
+logger = logging.getLogger(__name__)
+
+Pair = Tuple[System, Currency]
+RequestFactory = Callable[[System, Currency], GenerateAddressRequest]
+
+_STOP = object()
+
+
+class AddressStore(object):
+    def load(self) -> List[dict]:
+        return []
+
+    def add(self, entry: dict):
+        pass
+
+    def remove(self, invoice_id: str):
+        pass
+
+    def close(self):
+        pass
+
+
+class FileAddressStore(AddressStore):
+    def __init__(self, path: str, fsync: bool = True):
+        self._path = path
+        self._fsync = fsync
+        self._lock = threading.Lock()
+        self._file = None
+
+    def load(self) -> List[dict]:
+        entries = {}
+
+        with self._lock:
+            if os.path.exists(self._path):
+                with open(self._path, "r") as file:
+                    for line in file:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            # the last line is cut short when the process dies in the middle of a write
+                            continue
+
+                        if "add" in record:
+                            entries[record["add"]["invoice_id"]] = record["add"]
+                        else:
+                            entries.pop(record["remove"], None)
+
+            # the journal is rewritten with the remaining entries only, so it never grows past one pool
+            with open(self._path + ".tmp", "w") as file:
+                file.writelines(json.dumps({"add": entry}) + "\n" for entry in entries.values())
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(self._path + ".tmp", self._path)
+
+            if self._file is not None:
+                self._file.close()
+            self._file = open(self._path, "a")
+
+        return list(entries.values())
+
+    def add(self, entry: dict):
+        self.__append({"add": entry})
+
+    def remove(self, invoice_id: str):
+        self.__append({"remove": invoice_id})
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __append(self, record: dict):
+        with self._lock:
+            if self._file is None:
+                raise RuntimeError("The store isn't loaded")
+
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+            if self._fsync:
+                os.fsync(self._file.fileno())
+
+
+class AddressPool(object):
+    def __init__(self, client: MerchantApiInterface, pairs: Iterable[Pair], low: int = 5, high: int = 20,
+                 store: AddressStore = None, workers: int = 2, max_age: float = None):
+        if not 0 <= low < high:
+            raise ValueError("The low watermark must be below the high watermark")
+
+        self._client = client
+        self._low = low
+        self._high = high
+        self._store = store if store is not None else AddressStore()
+        self._max_age = max_age
+        self._request_factory = AddressPool.__make_request
+        self._lock = threading.Lock()
+        self._addresses = {}
+        self._refilling = set()
+        self._queue = queue.Queue()
+        self._closed = False
+
+        for system, currency in pairs:
+            validate_pair(system, currency)
+            self._addresses[(system, currency)] = deque()
+
+        for entry in self._store.load():
+            pair = (SYSTEMS_BY_CODE[entry["system"]], CURRENCIES_BY_VALUE[entry["currency"]])
+            self._addresses.setdefault(pair, deque()).append((entry["created"], AddressPool.__to_response(entry)))
+
+        self._threads = [threading.Thread(target=self.__work, name="paykassa-address-pool", daemon=True)
+                         for _ in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+        self.refill()
+
+    def set_request_factory(self, request_factory: RequestFactory) -> 'AddressPool':
+        self._request_factory = request_factory
+        return self
+
+    def get_pairs(self) -> List[Pair]:
+        with self._lock:
+            return list(self._addresses)
+
+    def get_size(self, system: System, currency: Currency) -> int:
+        with self._lock:
+            addresses = self._addresses.get((system, currency))
+            return len(addresses) if addresses is not None else 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(addresses) for addresses in self._addresses.values())
+
+    def take(self, system: System, currency: Currency) -> GenerateAddressResponse:
+        pair = (system, currency)
+        expired = []
+
+        with self._lock:
+            addresses = self._addresses.get(pair)
+            if addresses is None:
+                raise KeyError("%s on %s isn't pooled" % (currency.name, system.name))
+
+            response = None
+            while addresses and response is None:
+                created, response = addresses.popleft()
+                if self.__is_expired(created):
+                    expired.append(response.get_invoice_id())
+                    response = None
+
+            if len(addresses) < self._low:
+                self.__schedule(pair)
+
+        for invoice_id in expired:
+            self._store.remove(invoice_id)
+
+        if response is None:
+            return self._client.generate_address(self._request_factory(system, currency))
+
+        self._store.remove(response.get_invoice_id())
+        return response
+
+    def refill(self) -> 'AddressPool':
+        with self._lock:
+            for pair, addresses in self._addresses.items():
+                if len(addresses) < self._high:
+                    self.__schedule(pair)
+        return self
+
+    def join(self):
+        self._queue.join()
+
+    def close(self):
+        self._closed = True
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._store.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __schedule(self, pair: Pair):
+        if pair not in self._refilling:
+            self._refilling.add(pair)
+            self._queue.put(pair)
+
+    def __work(self):
+        while True:
+            pair = self._queue.get()
+            try:
+                if pair is _STOP:
+                    return
+                if not self._closed:
+                    self.__refill(pair)
+            finally:
+                self._queue.task_done()
+
+    def __refill(self, pair: Pair):
+        system, currency = pair
+        response = None
+        created = time.time()
+
+        try:
+            response = self._client.generate_address(self._request_factory(system, currency))
+            if response.has_error():
+                logger.warning("Failed to generate a %s address on %s: %s", currency.name, system.name,
+                               response.get_message())
+                response = None
+            else:
+                self._store.add(AddressPool.__to_entry(pair, created, response))
+        except Exception:
+            logger.exception("Failed to generate a %s address on %s", currency.name, system.name)
+            response = None
+
+        with self._lock:
+            addresses = self._addresses[pair]
+            if response is not None:
+                addresses.append((created, response))
+
+            # one address per job keeps the pairs interleaved, a failed pair waits for the next take or refill
+            if response is not None and len(addresses) < self._high:
+                self._queue.put(pair)
+            else:
+                self._refilling.discard(pair)
+
+    def __is_expired(self, created: float) -> bool:
+        return self._max_age is not None and time.time() - created > self._max_age
+
+    @staticmethod
+    def __make_request(system: System, currency: Currency) -> GenerateAddressRequest:
+        return GenerateAddressRequest() \
+            .set_system(system) \
+            .set_currency(currency)
+
+    @staticmethod
+    def __to_entry(pair: Pair, created: float, response: GenerateAddressResponse) -> dict:
+        system, currency = pair
+        return {
+            "invoice_id": response.get_invoice_id(),
+            "system": system.value,
+            "currency": currency.value,
+            "created": created,
+            "data": response.get_data(),
+        }
+
+    @staticmethod
+    def __to_response(entry: dict) -> GenerateAddressResponse:
+        return GenerateAddressResponse({"error": False, "message": "", "data": entry["data"]})
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import threading
+import time
+from typing import List, Tuple, Dict
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from paykassa.error import RateLimitExceeded
+from paykassa.middleware import Middleware, Call, Proceed, AsyncProceed
+from paykassa.transport import get_remaining_time
+
+Bucket = Tuple[str, float, float]
+
+
+class BucketStore(object):
+    def take(self, buckets: List[Bucket]) -> float:
+        pass
+
+
+class MemoryBucketStore(BucketStore):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = {}
+
+    def take(self, buckets: List[Bucket]) -> float:
+        with self._lock:
+            return _take(self._state, buckets, time.monotonic())
+
+
+class FileBucketStore(BucketStore):
+    def __init__(self, path: str):
+        if fcntl is None:
+            raise ImportError("FileBucketStore requires fcntl, which is not available on this platform")
+
+        self._path = path
+        self._lock = threading.Lock()
+
+    def take(self, buckets: List[Bucket]) -> float:
+        with self._lock, open(self._path, "a+") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                file.seek(0)
+                content = file.read()
+                state = {key: tuple(value) for key, value in json.loads(content).items()} if content else {}
+
+                wait = _take(state, buckets, time.time())
+
+                file.seek(0)
+                file.truncate()
+                file.write(json.dumps(state))
+                file.flush()
+                return wait
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+
+class RateLimiter(Middleware):
+    def __init__(self, rate: float, burst: float = None, endpoint_rates: Dict[str, Tuple[float, float]] = None,
+                 store: BucketStore = None, blocking: bool = True, max_wait: float = None):
+        self._rate = rate
+        self._burst = burst if burst is not None else max(1.0, rate)
+        self._endpoint_rates = endpoint_rates or {}
+        self._store = store if store is not None else MemoryBucketStore()
+        self._blocking = blocking
+        self._max_wait = max_wait
+
+    def handle(self, call: Call, proceed: Proceed) -> dict:
+        self.acquire(call.credential, call.endpoint)
+        return proceed(call)
+
+    async def handle_async(self, call: Call, proceed: AsyncProceed) -> dict:
+        await self.acquire_async(call.credential, call.endpoint)
+        return await proceed(call)
+
+    def try_acquire(self, credential: str, endpoint: str) -> float:
+        buckets = [(str(credential), self._rate, self._burst)]
+
+        if endpoint in self._endpoint_rates:
+            rate, burst = self._endpoint_rates[endpoint]
+            buckets.append(("%s:%s" % (credential, endpoint), rate, burst))
+
+        return self._store.take(buckets)
+
+    def acquire(self, credential: str, endpoint: str):
+        waited = 0.0
+
+        while True:
+            wait = self.try_acquire(credential, endpoint)
+            if wait <= 0:
+                return
+
+            self.__check_wait(endpoint, wait, waited)
+            time.sleep(wait)
+            waited += wait
+
+    async def acquire_async(self, credential: str, endpoint: str):
+        waited = 0.0
+
+        while True:
+            wait = self.try_acquire(credential, endpoint)
+            if wait <= 0:
+                return
+
+            self.__check_wait(endpoint, wait, waited)
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def __check_wait(self, endpoint: str, wait: float, waited: float):
+        if not self._blocking:
+            raise RateLimitExceeded("Rate limit for %s exceeded, retry in %.3fs" % (endpoint, wait))
+
+        if self._max_wait is not None and waited + wait > self._max_wait:
+            raise RateLimitExceeded("Rate limit for %s exceeded after waiting %.3fs" % (endpoint, waited))
+
+        remaining = get_remaining_time()
+        if remaining is not None and remaining < wait:
+            raise RateLimitExceeded("Rate limit for %s exceeded, the deadline is too close" % endpoint)
+
+
+def _take(state: dict, buckets: List[Bucket], now: float) -> float:
+    refilled = []
+    wait = 0.0
+
+    for key, rate, burst in buckets:
+        tokens, updated_at = state.get(key, (burst, now))
+        tokens = min(burst, tokens + max(0.0, now - updated_at) * rate)
+        refilled.append((key, tokens))
+
+        if tokens < 1:
+            wait = max(wait, (1 - tokens) / rate)
+
+    for key, tokens in refilled:
+        state[key] = (tokens - 1 if wait == 0 else tokens, now)
+
+    return wait
@@ -0,0 +1,105 @@
+import threading
+from typing import Callable, Iterable, Iterator, Tuple, Dict, List, Any
+
+from paykassa.batch import run_batch
+from paykassa.dto import CheckBalanceRequest, CheckBalanceResponse
+from paykassa.error import get_error_response
+from paykassa.merchant import MerchantApi
+from paykassa.payment import PaymentApi
+from paykassa.transport import Transport, deadline
+
+
+class ShopRegistry(object):
+    def __init__(self, transport: Transport = None, concurrency: int = 16,
+                 configure: Callable[[Any], Any] = None):
+        self._owns_transport = transport is None
+        self._transport = transport if transport is not None else Transport(pool_maxsize=concurrency)
+        self._concurrency = concurrency
+        self._configure = configure
+        self._lock = threading.Lock()
+        self._payment_apis = {}
+        self._merchant_apis = {}
+
+    def add_payment_shop(self, shop_id: str, api_id: int, api_key: str) -> 'ShopRegistry':
+        client = PaymentApi(api_id, api_key, self._transport)
+        if self._configure is not None:
+            self._configure(client)
+
+        with self._lock:
+            self._payment_apis[str(shop_id)] = client
+        return self
+
+    def add_merchant_shop(self, shop_id: str, sci_id: str, sci_key: str) -> 'ShopRegistry':
+        client = MerchantApi(sci_id, sci_key, self._transport)
+        if self._configure is not None:
+            self._configure(client)
+
+        with self._lock:
+            self._merchant_apis[str(shop_id)] = client
+        return self
+
+    def remove_shop(self, shop_id: str) -> 'ShopRegistry':
+        with self._lock:
+            self._payment_apis.pop(str(shop_id), None)
+            self._merchant_apis.pop(str(shop_id), None)
+        return self
+
+    def get_payment_api(self, shop_id: str) -> PaymentApi:
+        with self._lock:
+            if str(shop_id) not in self._payment_apis:
+                raise KeyError("No payment credentials for the shop %s" % shop_id)
+            return self._payment_apis[str(shop_id)]
+
+    def get_merchant_api(self, shop_id: str) -> MerchantApi:
+        with self._lock:
+            if str(shop_id) not in self._merchant_apis:
+                raise KeyError("No merchant credentials for the shop %s" % shop_id)
+            return self._merchant_apis[str(shop_id)]
+
+    def get_payment_shop_ids(self) -> List[str]:
+        with self._lock:
+            return list(self._payment_apis)
+
+    def get_merchant_shop_ids(self) -> List[str]:
+        with self._lock:
+            return list(self._merchant_apis)
+
+    def map_payment(self, fn: Callable[[str, PaymentApi], Any],
+                    shop_ids: Iterable[str] = None) -> Iterator[Tuple[str, Any]]:
+        shop_ids = self.get_payment_shop_ids() if shop_ids is None else [str(shop_id) for shop_id in shop_ids]
+        clients = [(shop_id, self.get_payment_api(shop_id)) for shop_id in shop_ids]
+
+        for (shop_id, _), result in run_batch(lambda entry: fn(*entry), clients, self._concurrency, False):
+            yield shop_id, result
+
+    def map_merchant(self, fn: Callable[[str, MerchantApi], Any],
+                     shop_ids: Iterable[str] = None) -> Iterator[Tuple[str, Any]]:
+        shop_ids = self.get_merchant_shop_ids() if shop_ids is None else [str(shop_id) for shop_id in shop_ids]
+        clients = [(shop_id, self.get_merchant_api(shop_id)) for shop_id in shop_ids]
+
+        for (shop_id, _), result in run_batch(lambda entry: fn(*entry), clients, self._concurrency, False):
+            yield shop_id, result
+
+    def check_balances(self, shop_ids: Iterable[str] = None, timeout: float = None) -> Dict[str, CheckBalanceResponse]:
+        def check_balance(shop_id: str, client: PaymentApi) -> CheckBalanceResponse:
+            try:
+                return client.check_balance(CheckBalanceRequest().set_shop_id(shop_id))
+            except Exception as e:
+                return ShopRegistry.__get_failed_balance(e)
+
+        with deadline(timeout):
+            return dict(self.map_payment(check_balance, shop_ids))
+
+    def close(self):
+        if self._owns_transport:
+            self._transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @staticmethod
+    def __get_failed_balance(e: Exception) -> CheckBalanceResponse:
+        return CheckBalanceResponse(get_error_response(e))
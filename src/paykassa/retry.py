@@ -0,0 +1,182 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Callable, Iterator, Awaitable
+
+from paykassa.error import CircuitOpenError, RequestTimeout, RateLimitExceeded
+from paykassa.middleware import Middleware, Call, Proceed, AsyncProceed
+from paykassa.transport import get_remaining_time
+
+IDEMPOTENT_ENDPOINTS = frozenset([
+    "api_get_shop_balance",
+    "api_get_shop_txids",
+    "sci_confirm_order",
+    "sci_confirm_transaction_notification",
+])
+
+
+class RetryPolicy(Middleware):
+    def __init__(self, attempts: int = 3, base_delay: float = 0.1, max_delay: float = 2.0, multiplier: float = 2.0,
+                 jitter: bool = True, retry_payments: bool = False):
+        self._attempts = attempts
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._multiplier = multiplier
+        self._jitter = jitter
+        self._endpoints = (IDEMPOTENT_ENDPOINTS | {"api_payment"}) if retry_payments else IDEMPOTENT_ENDPOINTS
+
+    def is_retryable(self, endpoint: str) -> bool:
+        return endpoint in self._endpoints
+
+    def get_delays(self, endpoint: str) -> Iterator[float]:
+        if not self.is_retryable(endpoint):
+            return
+
+        for attempt in range(self._attempts - 1):
+            delay = min(self._max_delay, self._base_delay * self._multiplier ** attempt)
+            yield random.uniform(0, delay) if self._jitter else delay
+
+    def handle(self, call: Call, proceed: Proceed) -> dict:
+        return call_with_retry(call.endpoint, lambda: proceed(call), self)
+
+    async def handle_async(self, call: Call, proceed: AsyncProceed) -> dict:
+        return await call_with_retry_async(call.endpoint, lambda: proceed(call), self)
+
+
+class CircuitBreaker(Middleware):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._circuits = {}
+
+    def get_state(self, endpoint: str) -> str:
+        with self._lock:
+            return self.__get_circuit(endpoint)["state"]
+
+    def handle(self, call: Call, proceed: Proceed) -> dict:
+        self.before_call(call.endpoint)
+
+        try:
+            response = proceed(call)
+        except RateLimitExceeded:
+            self.release_probe(call.endpoint)
+            raise
+        except Exception:
+            self.record_failure(call.endpoint)
+            raise
+
+        self.record_success(call.endpoint)
+        return response
+
+    async def handle_async(self, call: Call, proceed: AsyncProceed) -> dict:
+        self.before_call(call.endpoint)
+
+        try:
+            response = await proceed(call)
+        except RateLimitExceeded:
+            self.release_probe(call.endpoint)
+            raise
+        except Exception:
+            self.record_failure(call.endpoint)
+            raise
+
+        self.record_success(call.endpoint)
+        return response
+
+    def before_call(self, endpoint: str):
+        with self._lock:
+            circuit = self.__get_circuit(endpoint)
+
+            if circuit["state"] == self.OPEN:
+                if time.monotonic() - circuit["opened_at"] < self._reset_timeout:
+                    raise CircuitOpenError("Circuit for %s is open" % endpoint)
+                circuit["state"] = self.HALF_OPEN
+                circuit["probing"] = False
+
+            if circuit["state"] == self.HALF_OPEN:
+                if circuit["probing"]:
+                    raise CircuitOpenError("Circuit for %s is half-open" % endpoint)
+                circuit["probing"] = True
+
+    def release_probe(self, endpoint: str):
+        with self._lock:
+            self.__get_circuit(endpoint)["probing"] = False
+
+    def record_success(self, endpoint: str):
+        with self._lock:
+            circuit = self.__get_circuit(endpoint)
+            circuit["state"] = self.CLOSED
+            circuit["failures"] = 0
+            circuit["probing"] = False
+
+    def record_failure(self, endpoint: str):
+        with self._lock:
+            circuit = self.__get_circuit(endpoint)
+            circuit["failures"] += 1
+            circuit["probing"] = False
+
+            if circuit["state"] == self.HALF_OPEN or circuit["failures"] >= self._failure_threshold:
+                circuit["state"] = self.OPEN
+                circuit["opened_at"] = time.monotonic()
+
+    def __get_circuit(self, endpoint: str) -> dict:
+        if endpoint not in self._circuits:
+            self._circuits[endpoint] = {"state": self.CLOSED, "failures": 0, "opened_at": 0.0, "probing": False}
+
+        return self._circuits[endpoint]
+
+
+def call_with_retry(endpoint: str, send: Callable[[], dict], retry_policy: RetryPolicy = None) -> dict:
+    delays = retry_policy.get_delays(endpoint) if retry_policy is not None else iter(())
+
+    while True:
+        try:
+            return send()
+        except (RateLimitExceeded, CircuitOpenError):
+            raise
+        except Exception:
+            delay = _get_next_delay(delays)
+            if delay is None:
+                raise
+
+            time.sleep(delay)
+
+
+async def call_with_retry_async(endpoint: str, send: Callable[[], Awaitable[dict]],
+                                retry_policy: RetryPolicy = None) -> dict:
+    delays = retry_policy.get_delays(endpoint) if retry_policy is not None else iter(())
+
+    while True:
+        try:
+            return await send()
+        except (RateLimitExceeded, CircuitOpenError):
+            raise
+        except Exception:
+            delay = _get_next_delay(delays)
+            if delay is None:
+                raise
+
+            await asyncio.sleep(delay)
+
+
+def _get_next_delay(delays: Iterator[float]) -> float:
+    delay = next(delays, None)
+    if delay is None:
+        return None
+
+    try:
+        remaining = get_remaining_time()
+    except RequestTimeout:
+        return None
+
+    # don't sleep through the caller's deadline just to fail afterwards
+    if remaining is not None and remaining <= delay:
+        return None
+
+    return delay
@@ -0,0 +1,78 @@
+import heapq
+import threading
+from typing import Any, Hashable, List, Tuple
+
+
+class _Entry(object):
+    __slots__ = ("state", "poll_time")
+
+    def __init__(self, state: Any, poll_time: float):
+        self.state = state
+        self.poll_time = poll_time
+
+
+class PollSchedule(object):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._heap = []
+
+    def add(self, key: Hashable, state: Any, poll_time: float) -> bool:
+        with self._lock:
+            if key in self._pending:
+                return False
+
+            self.__push(key, _Entry(state, poll_time))
+            return True
+
+    def schedule(self, key: Hashable, state: Any, poll_time: float) -> bool:
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                return False
+
+            entry.state = state
+            entry.poll_time = poll_time
+            self.__push(key, entry)
+            return True
+
+    def discard(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._pending.pop(key, None) is not None
+
+    def get_pending(self) -> List[Hashable]:
+        with self._lock:
+            return list(self._pending)
+
+    def get_next_poll_time(self) -> float:
+        with self._lock:
+            self.__drop_stale_entries()
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float) -> List[Tuple[Hashable, Any]]:
+        due = []
+
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                poll_time, key = heapq.heappop(self._heap)
+                entry = self._pending.get(key)
+                if entry is not None and entry.poll_time == poll_time:
+                    due.append((key, entry.state))
+                    entry.poll_time = None
+
+        return due
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def __push(self, key: Hashable, entry: _Entry):
+        self._pending[key] = entry
+        heapq.heappush(self._heap, (entry.poll_time, key))
+
+    def __drop_stale_entries(self):
+        while self._heap:
+            poll_time, key = self._heap[0]
+            entry = self._pending.get(key)
+            if entry is not None and entry.poll_time == poll_time:
+                return
+            heapq.heappop(self._heap)
@@ -0,0 +1,470 @@
+import hashlib
+import heapq
+import itertools
+import json
+import math
+import random
+import threading
+import time
+from decimal import Decimal, InvalidOperation
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional, Tuple
+from urllib.parse import parse_qs
+
+from paykassa.struct import System, Currency, NAMES_BY_SYSTEM, SYSTEMS_BY_CODE, CURRENCIES_BY_VALUE, \
+    is_valid_pair
+
+Latency = Callable[[random.Random], float]
+
+SCI_PATH = "/sci/0.4/index.php"
+API_PATH = "/api/0.9/index.php"
+
+AMOUNT_QUANTUM = Decimal("0.00000001")
+
+
+def fixed_latency(seconds: float) -> Latency:
+    return lambda rng: seconds
+
+
+def uniform_latency(low: float, high: float) -> Latency:
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal_latency(median: float, sigma: float = 0.5) -> Latency:
+    return lambda rng: rng.lognormvariate(math.log(median), sigma)
+
+
+class SimulatorError(Exception):
+    pass
+
+
+class _Invoice(object):
+    def __init__(self, invoice_id: str, shop_id: str, order_id: str, amount: Decimal, system: System,
+                 currency: Currency, address: str, private_hash: str, paid_at: float, required_confirmations: int):
+        self.invoice_id = invoice_id
+        self.shop_id = shop_id
+        self.order_id = order_id
+        self.amount = amount
+        self.system = system
+        self.currency = currency
+        self.address = address
+        self.private_hash = private_hash
+        self.paid_at = paid_at
+        self.required_confirmations = required_confirmations
+        self.txid = None
+        self.credited = False
+
+
+class Simulator(object):
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, seed: int = None, confirm_after: float = 1.0,
+                 block_time: float = 1.0, required_confirmations: int = 3, commission_percent: str = "0.5"):
+        self._host = host
+        self._port = port
+        self._random = random.Random(seed)
+        self._confirm_after = confirm_after
+        self._block_time = block_time
+        self._required_confirmations = required_confirmations
+        self._commission_percent = Decimal(commission_percent)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(100000)
+        self._balances = {}
+        self._invoices = {}
+        self._hashes = {}
+        self._uncredited = []
+        self._latencies = {}
+        self._error_rates = {}
+        self._throttle_rates = {}
+        self._drip_chunk_size = None
+        self._drip_interval = 0.0
+        self._server = None
+
+    def set_latency(self, latency: Latency = None, func: str = None) -> 'Simulator':
+        self._latencies[func] = latency
+        return self
+
+    def set_error_rate(self, error_rate: float, func: str = None) -> 'Simulator':
+        self._error_rates[func] = error_rate
+        return self
+
+    def set_throttle_rate(self, throttle_rate: float, func: str = None) -> 'Simulator':
+        self._throttle_rates[func] = throttle_rate
+        return self
+
+    def set_drip(self, chunk_size: int = None, interval: float = 0.0) -> 'Simulator':
+        self._drip_chunk_size = chunk_size
+        self._drip_interval = interval
+        return self
+
+    def set_balance(self, shop_id: str, system: System, currency: Currency, amount: str) -> 'Simulator':
+        with self._lock:
+            self._balances[(str(shop_id), self.__get_balance_key(system, currency))] = Decimal(amount)
+        return self
+
+    def get_balance(self, shop_id: str, system: System, currency: Currency) -> Decimal:
+        with self._lock:
+            return self._balances.get((str(shop_id), self.__get_balance_key(system, currency)), Decimal(0))
+
+    def get_private_hash(self, invoice_id: str) -> str:
+        with self._lock:
+            return self._invoices[str(invoice_id)].private_hash
+
+    def pay(self, invoice_id: str) -> 'Simulator':
+        with self._lock:
+            invoice = self._invoices[str(invoice_id)]
+            if time.monotonic() < invoice.paid_at:
+                invoice.paid_at = time.monotonic()
+                self.__schedule_credit(invoice)
+        return self
+
+    def get_url(self) -> str:
+        return "http://%s:%d/" % self._server.server_address
+
+    def start(self) -> 'Simulator':
+        self._server = ThreadingHTTPServer((self._host, self._port), _SimulatorHandler)
+        self._server.daemon_threads = True
+        self._server.simulator = self
+        threading.Thread(target=self._server.serve_forever, name="paykassa-simulator", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _handle(self, path: str, form: dict) -> Tuple[int, bytes, Optional[int], float]:
+        func = form.get("func", "")
+
+        time.sleep(self.__get_latency(func))
+
+        if self.__roll(self._throttle_rates, func):
+            return 429, self.__encode_error("Too many requests"), None, 0.0
+
+        if self.__roll(self._error_rates, func):
+            return 500, b"Internal Server Error", None, 0.0
+
+        handlers = self.__get_sci_handlers() if path == SCI_PATH else \
+            self.__get_api_handlers() if path == API_PATH else None
+        if handlers is None:
+            return 404, b"Not Found", None, 0.0
+
+        if func not in handlers:
+            return 200, self.__encode_error("Unknown function: " + func), self._drip_chunk_size, self._drip_interval
+
+        try:
+            with self._lock:
+                data = handlers[func](form)
+            body = json.dumps({"error": False, "message": "Ok", "data": data}).encode()
+        except SimulatorError as e:
+            body = self.__encode_error(str(e))
+
+        return 200, body, self._drip_chunk_size, self._drip_interval
+
+    def __get_sci_handlers(self) -> dict:
+        return {
+            "sci_create_order_get_data": self.__create_order_get_data,
+            "sci_create_order": self.__create_order,
+            "sci_confirm_order": self.__confirm_order,
+            "sci_confirm_transaction_notification": self.__confirm_transaction_notification,
+        }
+
+    def __get_api_handlers(self) -> dict:
+        return {
+            "api_get_shop_balance": self.__get_shop_balance,
+            "api_payment": self.__payment,
+            "api_get_shop_txids": self.__get_shop_txids,
+        }
+
+    def __create_order_get_data(self, form: dict) -> dict:
+        invoice = self.__create_invoice(form)
+
+        return {
+            "invoice_id": invoice.invoice_id,
+            "order_id": invoice.order_id,
+            "wallet": invoice.address,
+            "amount": self.__format_amount(invoice.amount),
+            "system": NAMES_BY_SYSTEM[invoice.system],
+            "currency": invoice.currency.value,
+            "url": self.__get_invoice_url(invoice),
+            "tag": False,
+        }
+
+    def __create_order(self, form: dict) -> dict:
+        invoice = self.__create_invoice(form)
+
+        return {
+            "url": self.__get_invoice_url(invoice),
+            "method": "GET",
+            "params": {"hash": invoice.private_hash},
+        }
+
+    def __confirm_order(self, form: dict) -> dict:
+        invoice = self.__find_invoice(form)
+
+        if self.__get_confirmations(invoice) < invoice.required_confirmations:
+            raise SimulatorError("Payment is not confirmed yet")
+
+        return {
+            "transaction": invoice.invoice_id,
+            "shop_id": invoice.shop_id,
+            "order_id": invoice.order_id,
+            "amount": self.__format_amount(invoice.amount),
+            "currency": invoice.currency.value,
+            "system": NAMES_BY_SYSTEM[invoice.system],
+            "address": invoice.address,
+            "tag": "",
+            "hash": invoice.private_hash,
+            "partial": "no",
+        }
+
+    def __confirm_transaction_notification(self, form: dict) -> dict:
+        invoice = self.__find_invoice(form)
+        confirmations = self.__get_confirmations(invoice)
+
+        if confirmations is None:
+            raise SimulatorError("Transaction not found")
+
+        return {
+            "transaction": invoice.invoice_id,
+            "txid": invoice.txid,
+            "shop_id": invoice.shop_id,
+            "order_id": invoice.order_id,
+            "amount": self.__format_amount(invoice.amount),
+            "fee": self.__format_amount(Decimal(0)),
+            "currency": invoice.currency.value,
+            "system": NAMES_BY_SYSTEM[invoice.system],
+            "address_from": "",
+            "address": invoice.address,
+            "tag": "",
+            "confirmations": confirmations,
+            "required_confirmations": invoice.required_confirmations,
+            "status": "yes" if confirmations >= invoice.required_confirmations else "no",
+            "static": "no",
+            "date_update": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "explorer_address_link": "",
+            "explorer_transaction_link": "",
+        }
+
+    def __get_shop_balance(self, form: dict) -> dict:
+        shop_id = self.__get_field(form, "shop_id")
+        self.__credit_confirmed()
+
+        return {key: self.__format_amount(amount)
+                for (owner, key), amount in self._balances.items() if owner == shop_id}
+
+    def __payment(self, form: dict) -> dict:
+        shop_id = self.__get_field(form, "shop_id")
+        system, currency = self.__get_pair(form)
+        amount = self.__get_amount(form)
+        paid_commission = form.get("paid_commission", "shop")
+        self.__credit_confirmed()
+
+        commission = (amount * self._commission_percent / 100).quantize(AMOUNT_QUANTUM)
+        debit = amount + commission if paid_commission == "shop" else amount
+        key = (shop_id, self.__get_balance_key(system, currency))
+
+        if self._balances.get(key, Decimal(0)) < debit:
+            raise SimulatorError("Insufficient funds")
+
+        if not self.__is_test(form):
+            self._balances[key] -= debit
+
+        return {
+            "shop_id": shop_id,
+            "transaction": str(next(self._ids)),
+            "txid": self.__get_random_hex(),
+            "amount": self.__format_amount(amount),
+            "amount_pay": self.__format_amount(amount if paid_commission == "shop" else amount - commission),
+            "system": NAMES_BY_SYSTEM[system],
+            "currency": currency.value,
+            "number": self.__get_field(form, "number"),
+            "shop_commission_percent": str(self._commission_percent),
+            "shop_commission_amount": self.__format_amount(commission),
+            "paid_commission": paid_commission,
+        }
+
+    def __get_shop_txids(self, form: dict) -> dict:
+        shop_id = self.__get_field(form, "shop_id")
+        txids = {}
+
+        for invoice_id in form.get("invoices[]", []):
+            invoice = self._invoices.get(invoice_id)
+            if invoice is not None and invoice.shop_id == shop_id and self.__get_confirmations(invoice) is not None:
+                txids[invoice_id] = [invoice.txid]
+
+        return txids
+
+    def __create_invoice(self, form: dict) -> _Invoice:
+        system, currency = self.__get_pair(form)
+        invoice = _Invoice(
+            invoice_id=str(next(self._ids)),
+            shop_id=self.__get_field(form, "sci_id"),
+            order_id=self.__get_field(form, "order_id"),
+            amount=self.__get_amount(form),
+            system=system,
+            currency=currency,
+            address=self.__get_random_hex()[:34],
+            private_hash=self.__get_random_hex(),
+            paid_at=time.monotonic() + self._confirm_after,
+            required_confirmations=self._required_confirmations,
+        )
+
+        self._invoices[invoice.invoice_id] = invoice
+        self._hashes[invoice.private_hash] = invoice
+        self.__schedule_credit(invoice)
+        return invoice
+
+    def __find_invoice(self, form: dict) -> _Invoice:
+        invoice = self._hashes.get(form.get("private_hash", ""))
+        if invoice is None:
+            raise SimulatorError("Payment not found")
+
+        return invoice
+
+    def __get_confirmations(self, invoice: _Invoice) -> Optional[int]:
+        elapsed = time.monotonic() - invoice.paid_at
+        if elapsed < 0:
+            return None
+
+        if invoice.txid is None:
+            invoice.txid = self.__get_random_hex()
+
+        confirmations = invoice.required_confirmations if self._block_time <= 0 else \
+            min(invoice.required_confirmations, int(elapsed / self._block_time))
+
+        if confirmations >= invoice.required_confirmations and not invoice.credited:
+            invoice.credited = True
+            key = (invoice.shop_id, self.__get_balance_key(invoice.system, invoice.currency))
+            self._balances[key] = self._balances.get(key, Decimal(0)) + invoice.amount
+
+        return confirmations
+
+    def __schedule_credit(self, invoice: _Invoice):
+        credit_at = invoice.paid_at + max(self._block_time, 0) * invoice.required_confirmations
+        heapq.heappush(self._uncredited, (credit_at, invoice.invoice_id))
+
+    def __credit_confirmed(self):
+        now = time.monotonic()
+        early = []
+
+        # an invoice paid early by pay() keeps its first entry too, it's skipped once credited
+        while self._uncredited and self._uncredited[0][0] <= now:
+            credit_at, invoice_id = heapq.heappop(self._uncredited)
+            invoice = self._invoices[invoice_id]
+            if not invoice.credited:
+                self.__get_confirmations(invoice)
+                if not invoice.credited:
+                    # the division in __get_confirmations can round just below the last block
+                    early.append((credit_at, invoice_id))
+
+        for entry in early:
+            heapq.heappush(self._uncredited, entry)
+
+    def __get_latency(self, func: str) -> float:
+        latency = self._latencies.get(func, self._latencies.get(None))
+        if latency is None:
+            return 0.0
+
+        with self._lock:
+            return max(0.0, latency(self._random))
+
+    def __roll(self, rates: dict, func: str) -> bool:
+        rate = rates.get(func, rates.get(None, 0.0))
+        if not rate:
+            return False
+
+        with self._lock:
+            return self._random.random() < rate
+
+    def __get_random_hex(self) -> str:
+        return hashlib.sha256(self._random.getrandbits(256).to_bytes(32, "big")).hexdigest()
+
+    def __get_invoice_url(self, invoice: _Invoice) -> str:
+        return self.get_url() + "sci/index.php?hash=" + invoice.private_hash
+
+    @staticmethod
+    def __get_field(form: dict, name: str) -> str:
+        if not form.get(name):
+            raise SimulatorError("The %s field is required" % name)
+
+        return form[name]
+
+    @staticmethod
+    def __get_amount(form: dict) -> Decimal:
+        try:
+            amount = Decimal(Simulator.__get_field(form, "amount"))
+        except InvalidOperation:
+            raise SimulatorError("Invalid amount")
+
+        if amount <= 0:
+            raise SimulatorError("Invalid amount")
+
+        return amount.quantize(AMOUNT_QUANTUM)
+
+    @staticmethod
+    def __get_pair(form: dict) -> Tuple[System, Currency]:
+        system = SYSTEMS_BY_CODE.get(Simulator.__get_field(form, "system"))
+        if system is None:
+            raise SimulatorError("Unknown system")
+
+        currency = CURRENCIES_BY_VALUE.get(Simulator.__get_field(form, "currency"))
+        if currency is None:
+            raise SimulatorError("Unknown currency")
+
+        if not is_valid_pair(system, currency):
+            raise SimulatorError("%s is not supported by %s" % (currency.value, NAMES_BY_SYSTEM[system]))
+
+        return system, currency
+
+    @staticmethod
+    def __is_test(form: dict) -> bool:
+        return form.get("test", "") == "true"
+
+    @staticmethod
+    def __get_balance_key(system: System, currency: Currency) -> str:
+        return system.name.lower() + "_" + currency.name.lower()
+
+    @staticmethod
+    def __format_amount(amount: Decimal) -> str:
+        return format(amount.quantize(AMOUNT_QUANTUM), "f")
+
+    @staticmethod
+    def __encode_error(message: str) -> bytes:
+        return json.dumps({"error": True, "message": message, "data": {}}).encode()
+
+
+class _SimulatorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        fields = parse_qs(self.rfile.read(int(self.headers.get("Content-Length", 0))).decode())
+        form = {name: values if name.endswith("[]") else values[-1] for name, values in fields.items()}
+
+        status, body, chunk_size, interval = self.server.simulator._handle(self.path, form)
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json" if status in (200, 429) else "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        try:
+            if not chunk_size:
+                self.wfile.write(body)
+                return
+
+            for i in range(0, len(body), chunk_size):
+                self.wfile.write(body[i:i + chunk_size])
+                self.wfile.flush()
+                time.sleep(interval)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
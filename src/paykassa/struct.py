@@ -47,3 +47,77 @@ class System(Enum):
     BINANCESMARTCHAIN_BEP20 = "31"
     ETHEREUM_ERC20 = "32"
     TON = "33"
+
+
+class ErrorType(Enum):
+    API = "api"
+    TRANSPORT = "transport"
+    TIMEOUT = "timeout"
+    CIRCUIT_OPEN = "circuit_open"
+    RATE_LIMITED = "rate_limited"
+    VALIDATION = "validation"
+
+
+SYSTEMS_BY_NAME = {
+    "BitCoin": System.BITCOIN,
+    "Ethereum": System.ETHEREUM,
+    "Litecoin": System.LITECOIN,
+    "Dogecoin": System.DOGECOIN,
+    "Dash": System.DASH,
+    "BitcoinCash": System.BITCOINCASH,
+    "Ripple": System.RIPPLE,
+    "TRON": System.TRON,
+    "Stellar": System.STELLAR,
+    "BinanceCoin": System.BINANCECOIN,
+    "TRON_TRC20": System.TRON_TRC20,
+    "BinanceSmartChain_BEP20": System.BINANCESMARTCHAIN_BEP20,
+    "Ethereum_ERC20": System.ETHEREUM_ERC20,
+    "TON": System.TON,
+}
+
+NAMES_BY_SYSTEM = {system: name for name, system in SYSTEMS_BY_NAME.items()}
+
+SYSTEMS_BY_CODE = {system.value: system for system in System}
+
+CURRENCIES_BY_VALUE = {currency.value: currency for currency in Currency}
+
+SYSTEM_CURRENCIES = {
+    System.BITCOIN: frozenset({Currency.BTC}),
+    System.ETHEREUM: frozenset({Currency.ETH}),
+    System.LITECOIN: frozenset({Currency.LTC}),
+    System.DOGECOIN: frozenset({Currency.DOGE}),
+    System.DASH: frozenset({Currency.DASH}),
+    System.BITCOINCASH: frozenset({Currency.BCH}),
+    System.RIPPLE: frozenset({Currency.XRP}),
+    System.TRON: frozenset({Currency.TRX}),
+    System.STELLAR: frozenset({Currency.XLM}),
+    System.BINANCECOIN: frozenset({Currency.BNB}),
+    System.TRON_TRC20: frozenset({Currency.USDT, Currency.USDC}),
+    System.BINANCESMARTCHAIN_BEP20: frozenset({
+        Currency.USDT, Currency.BUSD, Currency.USDC, Currency.ADA, Currency.EOS,
+        Currency.BTC, Currency.ETH, Currency.DOGE, Currency.SHIB,
+    }),
+    System.ETHEREUM_ERC20: frozenset({Currency.USDT, Currency.USDC, Currency.BUSD, Currency.SHIB}),
+    System.TON: frozenset({Currency.TON, Currency.USDT}),
+}
+
+PAIRS = frozenset((system, currency) for system, currencies in SYSTEM_CURRENCIES.items() for currency in currencies)
+
+
+def is_valid_pair(system: System, currency: Currency) -> bool:
+    return (system, currency) in PAIRS
+
+
+class InvalidPairError(ValueError):
+    error_type = ErrorType.VALIDATION
+
+
+def validate_pair(system: System, currency: Currency):
+    if (system, currency) not in PAIRS:
+        raise InvalidPairError("%s is not supported by %s" % (currency.name, system.name))
+
+
+BALANCE_KEYS = {(system, currency): system.name.lower() + "_" + currency.name.lower()
+                for system in System for currency in Currency}
+
+PAIRS_BY_BALANCE_KEY = {key: pair for pair, key in BALANCE_KEYS.items()}
@@ -0,0 +1,92 @@
+import logging
+import threading
+import time
+from typing import Iterable, Iterator, List, Tuple, Callable
+
+from paykassa.dto import GetTxidsOfInvoicesRequest, GetTxidsOfInvoicesResponse
+from paykassa.payment import PaymentApiInterface
+from paykassa.schedule import PollSchedule
+
+logger = logging.getLogger(__name__)
+
+
+class TxidTracker(object):
+    def __init__(self, client: PaymentApiInterface, shop_id: str, interval: float = 30.0,
+                 max_interval: float = 3600.0, backoff: float = 2.0):
+        self._client = client
+        self._shop_id = shop_id
+        self._interval = interval
+        self._max_interval = max_interval
+        self._backoff = backoff
+        self._schedule = PollSchedule()
+
+    def add(self, invoice_ids: Iterable[str]) -> 'TxidTracker':
+        now = time.monotonic()
+
+        for invoice_id in invoice_ids:
+            self._schedule.add(str(invoice_id), 0, now)
+
+        return self
+
+    def discard(self, invoice_id: str):
+        self._schedule.discard(str(invoice_id))
+
+    def get_pending(self) -> List[str]:
+        return self._schedule.get_pending()
+
+    def get_next_poll_time(self) -> float:
+        return self._schedule.get_next_poll_time()
+
+    def __len__(self) -> int:
+        return len(self._schedule)
+
+    def poll(self) -> List[Tuple[str, List[str]]]:
+        due = self._schedule.pop_due(time.monotonic())
+        if not due:
+            return []
+
+        response = self.__get_txids([invoice_id for invoice_id, _ in due])
+        txids = response.get_all_txids() if response is not None else {}
+        resolved = []
+        now = time.monotonic()
+
+        for invoice_id, attempts in due:
+            if not txids.get(invoice_id):
+                self._schedule.schedule(invoice_id, attempts + 1, now + self.__get_delay(attempts + 1))
+            elif self._schedule.discard(invoice_id):
+                resolved.append((invoice_id, txids[invoice_id]))
+
+        return resolved
+
+    def watch(self, stop: threading.Event = None,
+              callback: Callable[[str, List[str]], None] = None) -> Iterator[Tuple[str, List[str]]]:
+        stop = stop if stop is not None else threading.Event()
+
+        while not stop.is_set():
+            for invoice_id, txids in self.poll():
+                if callback is not None:
+                    callback(invoice_id, txids)
+                yield invoice_id, txids
+
+            next_poll_time = self.get_next_poll_time()
+            delay = self._interval if next_poll_time is None else next_poll_time - time.monotonic()
+            if delay > 0:
+                stop.wait(delay)
+
+    def __get_txids(self, invoice_ids: List[str]) -> GetTxidsOfInvoicesResponse:
+        try:
+            response = self._client.get_txids_by_invoices(GetTxidsOfInvoicesRequest()
+                                                          .set_shop_id(self._shop_id)
+                                                          .set_invoices(invoice_ids))
+        except Exception:
+            logger.exception("Failed to get the txids of %d invoices", len(invoice_ids))
+            return None
+
+        if response.has_error():
+            logger.warning("Failed to get the txids of %d invoices: %s", len(invoice_ids), response.get_message())
+            return None
+
+        return response
+
+    def __get_delay(self, attempts: int) -> float:
+        return min(self._max_interval, self._interval * self._backoff ** (attempts - 1))
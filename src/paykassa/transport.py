@@ -0,0 +1,155 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ReadTimeoutError
+
+from paykassa.decoder import Decoder, get_decoder
+from paykassa.error import RequestTimeout
+from paykassa.form import HEADERS, encode
+
+_deadline = ContextVar("paykassa_deadline", default=None)
+
+
+@contextmanager
+def deadline(timeout: Optional[float]):
+    if timeout is None:
+        yield
+        return
+
+    expires_at = time.monotonic() + timeout
+    current = _deadline.get()
+    token = _deadline.set(expires_at if current is None else min(current, expires_at))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def get_remaining_time() -> Optional[float]:
+    expires_at = _deadline.get()
+    if expires_at is None:
+        return None
+
+    remaining = expires_at - time.monotonic()
+    if remaining <= 0:
+        raise RequestTimeout("Deadline exceeded")
+
+    return remaining
+
+
+class Transport(object):
+    CHUNK_SIZE = 4096
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 10, pool_block: bool = False,
+                 idle_timeout: float = None, connect_timeout: float = 5.0, read_timeout: float = 30.0):
+        self._pool_connections = pool_connections
+        self._pool_maxsize = pool_maxsize
+        self._pool_block = pool_block
+        self._idle_timeout = idle_timeout
+        self._connect_timeout = connect_timeout
+        self._read_timeout = read_timeout
+        self._lock = threading.Lock()
+        self._session = None
+        self._last_used = 0.0
+        self._in_flight = 0
+
+    def post(self, url: str, data: dict, decoder: Decoder = None) -> dict:
+        remaining = get_remaining_time()
+        decode = decoder or get_decoder()
+
+        session = self.__acquire_session()
+        try:
+            with session.post(url, encode(data), headers=HEADERS, timeout=self.__get_timeout(remaining),
+                              stream=True) as response:
+                return decode(self.__read_body(response, remaining))
+        except (requests.Timeout, ReadTimeoutError) as e:
+            raise RequestTimeout(str(e)) from e
+        except requests.ConnectionError as e:
+            # requests reports a read timeout while consuming the body as a connection error
+            if e.args and isinstance(e.args[0], ReadTimeoutError):
+                raise RequestTimeout(str(e)) from e
+            raise
+        finally:
+            self.__release_session()
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __get_timeout(self, remaining: Optional[float]) -> tuple:
+        if remaining is None:
+            return self._connect_timeout, self._read_timeout
+
+        return min(self._connect_timeout or remaining, remaining), min(self._read_timeout or remaining, remaining)
+
+    def __read_body(self, response: requests.Response, remaining: Optional[float]) -> bytes:
+        if remaining is None:
+            return response.content
+
+        # a body that trickles in never trips the socket timeout between two bytes, so every read gets only the
+        # time that is left and returns whatever has arrived instead of waiting for a full chunk
+        raw = response.raw
+        read = getattr(raw, "read1", raw.read)
+        sock = getattr(getattr(raw, "connection", None), "sock", None)
+
+        body = bytearray()
+        while True:
+            remaining = get_remaining_time()
+            if sock is not None:
+                sock.settimeout(min(self._read_timeout or remaining, remaining))
+
+            chunk = read(self.CHUNK_SIZE, decode_content=True)
+            if not chunk:
+                return bytes(body)
+            body += chunk
+
+    def __acquire_session(self) -> requests.Session:
+        with self._lock:
+            now = time.monotonic()
+
+            if self.__is_idle(now):
+                self._session.close()
+                self._session = None
+
+            if self._session is None:
+                self._session = self.__create_session()
+
+            self._in_flight += 1
+            self._last_used = now
+            return self._session
+
+    def __release_session(self):
+        with self._lock:
+            self._in_flight -= 1
+            self._last_used = time.monotonic()
+
+    def __is_idle(self, now: float) -> bool:
+        return self._session is not None \
+            and self._idle_timeout is not None \
+            and self._in_flight == 0 \
+            and now - self._last_used >= self._idle_timeout
+
+    def __create_session(self) -> requests.Session:
+        adapter = HTTPAdapter(
+            pool_connections=self._pool_connections,
+            pool_maxsize=self._pool_maxsize,
+            pool_block=self._pool_block,
+        )
+
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
@@ -0,0 +1,175 @@
+import logging
+import threading
+import time
+from typing import Iterable, Iterator, List, Tuple, Callable, Dict
+
+from paykassa.batch import run_batch
+from paykassa.dto import CheckTransactionRequest, CheckTransactionResponse
+from paykassa.merchant import MerchantApiInterface
+from paykassa.schedule import PollSchedule
+from paykassa.struct import System
+
+logger = logging.getLogger(__name__)
+
+Event = Tuple[str, CheckTransactionResponse]
+
+FINAL_STATUSES = frozenset({"yes"})
+
+BLOCK_TIMES = {
+    System.BITCOIN: 600.0,
+    System.ETHEREUM: 12.0,
+    System.LITECOIN: 150.0,
+    System.DOGECOIN: 60.0,
+    System.DASH: 150.0,
+    System.BITCOINCASH: 600.0,
+    System.RIPPLE: 4.0,
+    System.TRON: 3.0,
+    System.STELLAR: 5.0,
+    System.BINANCECOIN: 3.0,
+    System.TRON_TRC20: 3.0,
+    System.BINANCESMARTCHAIN_BEP20: 3.0,
+    System.ETHEREUM_ERC20: 12.0,
+    System.TON: 5.0,
+}
+
+
+class _Watch(object):
+    __slots__ = ("confirmations", "status", "errors")
+
+    def __init__(self):
+        self.confirmations = None
+        self.status = None
+        self.errors = 0
+
+
+class ConfirmationWatcher(object):
+    def __init__(self, client: MerchantApiInterface, concurrency: int = 8, block_times: Dict[System, float] = None,
+                 default_block_time: float = 60.0, block_fraction: float = 0.5, min_interval: float = 1.0,
+                 max_interval: float = 3600.0, error_interval: float = 30.0):
+        self._client = client
+        self._concurrency = concurrency
+        self._block_times = dict(BLOCK_TIMES)
+        self._block_times.update(block_times or {})
+        self._default_block_time = default_block_time
+        self._block_fraction = block_fraction
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._error_interval = error_interval
+        self._test = False
+        self._schedule = PollSchedule()
+
+    def set_test(self, test: bool) -> 'ConfirmationWatcher':
+        self._test = test
+        return self
+
+    def add(self, private_hashes: Iterable[str]) -> 'ConfirmationWatcher':
+        now = time.monotonic()
+
+        for private_hash in private_hashes:
+            self._schedule.add(private_hash, _Watch(), now)
+
+        return self
+
+    def discard(self, private_hash: str):
+        self._schedule.discard(private_hash)
+
+    def get_pending(self) -> List[str]:
+        return self._schedule.get_pending()
+
+    def get_next_poll_time(self) -> float:
+        return self._schedule.get_next_poll_time()
+
+    def __len__(self) -> int:
+        return len(self._schedule)
+
+    def poll(self) -> List[Event]:
+        due = dict(self._schedule.pop_due(time.monotonic()))
+        if not due:
+            return []
+
+        events = []
+        try:
+            for private_hash, response in run_batch(self.__check, list(due), self._concurrency, False):
+                event = self.__update(private_hash, due.pop(private_hash), response, time.monotonic())
+                if event is not None:
+                    events.append(event)
+        finally:
+            # whatever the batch didn't get to is retried like an error rather than dropped from the schedule
+            now = time.monotonic()
+            for private_hash, watch in due.items():
+                self.__schedule_retry(private_hash, watch, now)
+
+        return events
+
+    def watch(self, stop: threading.Event = None,
+              callback: Callable[[str, CheckTransactionResponse], None] = None) -> Iterator[Event]:
+        stop = stop if stop is not None else threading.Event()
+
+        while not stop.is_set():
+            for private_hash, response in self.poll():
+                if callback is not None:
+                    callback(private_hash, response)
+                yield private_hash, response
+
+            next_poll_time = self.get_next_poll_time()
+            delay = self._min_interval if next_poll_time is None else next_poll_time - time.monotonic()
+            if delay > 0:
+                stop.wait(delay)
+
+    def get_delay(self, system: System, confirmations: int, required_confirmations: int, changed: bool) -> float:
+        block_time = self._block_times.get(system, self._default_block_time)
+        remaining = max(required_confirmations - confirmations, 1)
+
+        # right after a change the next blocks are expected on schedule, so the poll lands just after the last one;
+        # when nothing changed the block is late and it's checked again within a fraction of the block time
+        blocks = remaining - 1 + self._block_fraction if changed else self._block_fraction
+        return min(self._max_interval, max(self._min_interval, block_time * blocks))
+
+    def __check(self, private_hash: str) -> CheckTransactionResponse:
+        try:
+            return self._client.check_transaction(CheckTransactionRequest()
+                                                  .set_private_hash(private_hash)
+                                                  .set_test(self._test))
+        except Exception:
+            logger.exception("Failed to check the transaction %s", private_hash)
+            return None
+
+    def __update(self, private_hash: str, watch: _Watch, response: CheckTransactionResponse, now: float) -> Event:
+        if response is None or response.has_error():
+            self.__schedule_retry(private_hash, watch, now)
+            return None
+
+        try:
+            confirmations = response.get_confirmations()
+            required_confirmations = response.get_required_confirmations()
+            status = response.get_status()
+        except (KeyError, TypeError, ValueError):
+            logger.warning("Malformed response for the transaction %s", private_hash, exc_info=True)
+            self.__schedule_retry(private_hash, watch, now)
+            return None
+
+        changed = confirmations != watch.confirmations or status != watch.status
+
+        watch.confirmations = confirmations
+        watch.status = status
+        watch.errors = 0
+
+        if status in FINAL_STATUSES:
+            pending = self._schedule.discard(private_hash)
+        else:
+            pending = self._schedule.schedule(private_hash, watch, now + self.get_delay(
+                ConfirmationWatcher.__get_system(response), confirmations, required_confirmations, changed))
+
+        return (private_hash, response) if changed and pending else None
+
+    def __schedule_retry(self, private_hash: str, watch: _Watch, now: float):
+        watch.errors += 1
+        self._schedule.schedule(private_hash, watch, now + min(self._max_interval,
+                                                               self._error_interval * 2 ** (watch.errors - 1)))
+
+    @staticmethod
+    def __get_system(response: CheckTransactionResponse) -> System:
+        try:
+            return response.get_system()
+        except KeyError:
+            return None
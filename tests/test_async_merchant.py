@@ -0,0 +1,43 @@
+from unittest import IsolatedAsyncioTestCase
+
+from paykassa.struct import Currency, System
+from paykassa.dto import CheckPaymentRequest, CheckTransactionRequest, GenerateAddressRequest, GetPaymentUrlRequest
+from paykassa.async_merchant import AsyncMerchantApi
+from tests.test_merchant import MerchantApiMock
+
+
+class AsyncMerchantApiMock(AsyncMerchantApi):
+    async def _make_request(self, endpoint: str, request: dict) -> dict:
+        return MerchantApiMock._make_request(self, endpoint, request)
+
+
+class TestAsyncMerchantApi(IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.client = AsyncMerchantApiMock("1", "test")
+
+    async def test_check_payment(self):
+        response = await self.client.check_payment(CheckPaymentRequest())
+
+        self.assertFalse(response.has_error())
+        self.assertEqual("96401", response.get_transaction())
+        self.assertEqual(System.BITCOIN, response.get_system())
+
+    async def test_check_transaction(self):
+        response = await self.client.check_transaction(CheckTransactionRequest())
+
+        self.assertFalse(response.has_error())
+        self.assertEqual("2431038", response.get_transaction())
+        self.assertEqual(Currency.DOGE, response.get_currency())
+        self.assertEqual(3, response.get_required_confirmations())
+
+    async def test_generate_address(self):
+        response = await self.client.generate_address(GenerateAddressRequest())
+
+        self.assertFalse(response.has_error())
+        self.assertEqual("3LaKdUrPfVyZeEVYpZei3HwjqQj5AHHTCE", response.get_wallet())
+
+    async def test_get_payment_url(self):
+        response = await self.client.get_payment_url(GetPaymentUrlRequest())
+
+        self.assertFalse(response.has_error())
+        self.assertEqual("GET", response.get_method())
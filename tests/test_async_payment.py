@@ -0,0 +1,52 @@
+from unittest import IsolatedAsyncioTestCase
+
+from paykassa.struct import System, Currency, ErrorType
+from paykassa.dto import CheckBalanceRequest, MakePaymentRequest, GetTxidsOfInvoicesRequest
+from paykassa.async_payment import AsyncPaymentApi
+from tests.test_payment import PaymentApiMock
+
+
+class AsyncPaymentApiMock(AsyncPaymentApi):
+    async def _make_request(self, endpoint: str, request: dict) -> dict:
+        return PaymentApiMock._make_request(self, endpoint, request)
+
+
+class TestAsyncPaymentApi(IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.client = AsyncPaymentApiMock("1", "test")
+
+    async def test_check_balance(self):
+        response = await self.client.check_balance(CheckBalanceRequest())
+
+        self.assertFalse(response.has_error())
+        self.assertEqual("6.19148781", response.get_balance(System.BITCOIN, Currency.BTC))
+
+    async def test_make_payment(self):
+        response = await self.client.make_payment(MakePaymentRequest())
+
+        self.assertFalse(response.has_error())
+        self.assertEqual("130236", response.get_transaction())
+        self.assertEqual(Currency.BTC, response.get_currency())
+
+    async def test_get_txids_by_invoices(self):
+        response = await self.client.get_txids_by_invoices(GetTxidsOfInvoicesRequest())
+
+        self.assertFalse(response.has_error())
+        self.assertEqual(["222222222555555555666666667777777788888888889999999"],
+                         response.get_txids_of_invoice("222222222"))
+
+    async def test_make_payments(self):
+        requests = [MakePaymentRequest().set_shop_id(str(i)) for i in range(5)]
+
+        results = [result async for result in self.client.make_payments(requests, concurrency=2)]
+
+        self.assertEqual(requests, [request for request, _ in results])
+        self.assertTrue(all(not response.has_error() for _, response in results))
+
+    async def test_make_payments_rejects_invalid_pair(self):
+        requests = [MakePaymentRequest().set_system(System.BITCOIN).set_currency(Currency.ETH)]
+
+        results = [result async for result in self.client.make_payments(requests)]
+
+        self.assertEqual(ErrorType.VALIDATION, results[0][1].get_error_type())
+
@@ -0,0 +1,86 @@
+import threading
+import time
+from unittest import TestCase
+
+from paykassa.cache import TtlCache
+from paykassa.error import RequestTimeout
+from paykassa.transport import deadline
+
+
+class TestTtlCache(TestCase):
+    def test_expires_entries(self):
+        cache = TtlCache(0.05)
+        cache.set("key", "value")
+
+        self.assertEqual("value", cache.get("key"))
+        time.sleep(0.06)
+        self.assertIsNone(cache.get("key"))
+
+    def test_evicts_least_recently_used(self):
+        cache = TtlCache(60, max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(2, len(cache))
+        self.assertEqual(1, cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(3, cache.get("c"))
+
+    def test_coalesces_concurrent_loads(self):
+        cache = TtlCache(60)
+        calls = []
+        release = threading.Event()
+
+        def loader():
+            calls.append(1)
+            release.wait()
+            return "value"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("key", loader)))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, len(calls))
+        self.assertEqual(["value"] * 8, results)
+        self.assertEqual("value", cache.get("key"))
+
+    def test_skips_uncacheable_values(self):
+        cache = TtlCache(60)
+
+        cache.get_or_load("key", lambda: "error", lambda value: value != "error")
+
+        self.assertIsNone(cache.get("key"))
+
+    def test_invalidation_discards_in_flight_load(self):
+        cache = TtlCache(60)
+
+        def loader():
+            cache.invalidate("key")
+            return "stale"
+
+        self.assertEqual("stale", cache.get_or_load("key", loader))
+        self.assertIsNone(cache.get("key"))
+
+    def test_follower_keeps_its_deadline(self):
+        cache = TtlCache(60)
+        release = threading.Event()
+        leader = threading.Thread(target=cache.get_or_load, args=("key", lambda: release.wait(5)))
+        leader.start()
+        time.sleep(0.01)
+
+        started = time.monotonic()
+        with deadline(0.05), self.assertRaises(RequestTimeout):
+            cache.get_or_load("key", lambda: "value")
+
+        self.assertLess(time.monotonic() - started, 0.5)
+        release.set()
+        leader.join()
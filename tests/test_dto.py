@@ -1,8 +1,10 @@
+from decimal import Decimal
 from unittest import TestCase
 
-from paykassa.struct import Currency, System, TransactionPriority, CommissionPayer
+from paykassa.struct import Currency, System, TransactionPriority, CommissionPayer, SYSTEMS_BY_NAME, SYSTEMS_BY_CODE, \
+    CURRENCIES_BY_VALUE, is_valid_pair
 from paykassa.dto import CheckBalanceRequest, MakePaymentRequest, CheckPaymentRequest, CheckTransactionRequest, \
-    GenerateAddressRequest, GetPaymentUrlRequest, GetTxidsOfInvoicesRequest
+    GenerateAddressRequest, GetPaymentUrlRequest, GetTxidsOfInvoicesRequest, CheckTransactionResponse
 
 
 class TestCheckBalanceRequest(TestCase):
@@ -70,7 +72,7 @@ class TestGenerateAddressRequest(TestCase):
         request = GenerateAddressRequest() \
             .set_order_id("order_id") \
             .set_amount("123123.4506456") \
-            .set_currency(Currency.BTC) \
+            .set_currency(Currency.DOGE) \
             .set_system(System.DOGECOIN) \
             .set_comment("") \
             .set_paid_commission(CommissionPayer.CLIENT) \
@@ -79,7 +81,7 @@ class TestGenerateAddressRequest(TestCase):
         self.assertDictEqual({
             "order_id": "order_id",
             "amount": "123123.4506456",
-            "currency": "BTC",
+            "currency": "DOGE",
             "system": "15",
             "comment": "",
             "phone": False,
@@ -87,6 +89,13 @@ class TestGenerateAddressRequest(TestCase):
             "test": True,
         }, request.normalize())
 
+    def test_rejects_invalid_pair(self):
+        request = GenerateAddressRequest() \
+            .set_currency(Currency.BTC) \
+            .set_system(System.DOGECOIN)
+
+        self.assertRaisesRegex(ValueError, "BTC is not supported by DOGECOIN", request.normalize)
+
 
 class TestGetPaymentUrlRequest(TestCase):
     def test_normalize(self):
@@ -120,4 +129,70 @@ class TestGetTxidByInvoicesRequest(TestCase):
         self.assertDictEqual({
             "shop_id": "100500",
             "invoices[]": [ "100", "200", "300", ],
-        }, request.normalize())
\ No newline at end of file
+        }, request.normalize())
+
+
+class TestCheckTransactionResponse(TestCase):
+    def test_compact(self):
+        data = {
+            "error": False,
+            "message": "Ok",
+            "data": {
+                "transaction": "2431038",
+                "txid": "e2be8b51ad0ccbae2a2433f8c940035ce97903c7de1a1cefa1db40cc1cabb0e5",
+                "amount": "1.00000000",
+                "system": "Dogecoin",
+                "confirmations": 2,
+                "status": "no",
+            },
+        }
+
+        response = CheckTransactionResponse(data, keep_raw=False)
+
+        self.assertFalse(hasattr(response, "__dict__"))
+        self.assertEqual("2431038", response.get_transaction())
+        self.assertEqual("1.00000000", response.get_amount())
+        self.assertEqual(System.DOGECOIN, response.get_system())
+        self.assertEqual(2, response.get_confirmations())
+        self.assertEqual("", response.get_tag())
+        self.assertRaises(KeyError, response.get_fee)
+        self.assertEqual(data["data"], response.get_data())
+
+        self.assertEqual(response.get_txid(), CheckTransactionResponse(data).compact().get_txid())
+
+    def test_parse_once(self):
+        data = {
+            "error": False,
+            "message": "Ok",
+            "data": {
+                "amount": "1.00000000",
+                "fee": 0.001,
+                "system": "Dogecoin",
+                "currency": "DOGE",
+            },
+        }
+
+        response = CheckTransactionResponse(data, eager=True)
+        data["data"]["amount"] = "2.00000000"
+
+        self.assertEqual(Decimal("1.00000000"), response.get_amount_decimal())
+        self.assertEqual("2.00000000", response.get_amount())
+        self.assertEqual(Decimal("0.001"), response.get_fee_decimal())
+        self.assertIs(response.get_fee_decimal(), response.get_fee_decimal())
+        self.assertEqual(Currency.DOGE, response.get_currency())
+
+    def test_from_bytes(self):
+        response = CheckTransactionResponse.from_bytes(b'{"error": false, "message": "Ok", "data": {"fee": "0.1"}}')
+
+        self.assertFalse(response.has_error())
+        self.assertEqual(Decimal("0.1"), response.get_fee_decimal())
+
+
+class TestSystemLookup(TestCase):
+    def test_lookup_tables(self):
+        self.assertIs(System.LITECOIN, SYSTEMS_BY_NAME["Litecoin"])
+        self.assertIs(System.TRON_TRC20, SYSTEMS_BY_CODE["30"])
+        self.assertIs(Currency.USDT, CURRENCIES_BY_VALUE["USDT"])
+        self.assertTrue(is_valid_pair(System.BINANCESMARTCHAIN_BEP20, Currency.ADA))
+        self.assertFalse(is_valid_pair(System.BITCOIN, Currency.ETH))
+        self.assertEqual(set(System), set(SYSTEMS_BY_NAME.values()))
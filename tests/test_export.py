@@ -0,0 +1,93 @@
+from decimal import Decimal
+from unittest import TestCase, skipIf
+
+from paykassa.dto import CheckTransactionResponse, CheckPaymentResponse
+from paykassa.export import to_columns, to_records, to_dataframe, numpy, pandas
+from paykassa.struct import System, Currency
+
+
+def get_transaction(transaction: str, amount: str, system: str, currency: str,
+                    confirmations: int = 3) -> CheckTransactionResponse:
+    return CheckTransactionResponse({
+        "error": False,
+        "message": "Ok",
+        "data": {
+            "transaction": transaction,
+            "txid": transaction * 4,
+            "shop_id": "138",
+            "order_id": "order " + transaction,
+            "amount": amount,
+            "fee": "0.00100000",
+            "currency": currency,
+            "system": system,
+            "address": "DKpzDZuFoTpPpnpsMro8NBtmDz8rinCjqp",
+            "confirmations": confirmations,
+            "required_confirmations": 3,
+            "status": "yes",
+            "date_update": "2020-07-23 15:06:58",
+        },
+    })
+
+
+def get_transactions() -> list:
+    return [
+        get_transaction("1", "1.50000000", "Dogecoin", "DOGE"),
+        CheckTransactionResponse({"error": True, "message": "Transaction not found", "data": {}}),
+        get_transaction("2", "0.01000000", "BitCoin", "BTC", 1),
+        get_transaction("3", "2.50000000", "Dogecoin", "DOGE"),
+    ]
+
+
+class TestExport(TestCase):
+    def test_to_columns(self):
+        columns = to_columns(get_transactions())
+
+        self.assertEqual(["1", "2", "3"], columns["transaction"])
+        self.assertEqual([Decimal("1.5"), Decimal("0.01"), Decimal("2.5")], columns["amount"])
+        self.assertEqual([System.DOGECOIN, System.BITCOIN, System.DOGECOIN], columns["system"])
+        self.assertEqual([Currency.DOGE, Currency.BTC, Currency.DOGE], columns["currency"])
+        self.assertEqual([3, 1, 3], columns["confirmations"])
+
+    def test_to_columns_tolerates_malformed_fields(self):
+        responses = [
+            get_transaction("1", "1.50000000", "Dogecoin", "DOGE"),
+            get_transaction("2", "0.10000000", "Monero", "XMR", None),
+            get_transaction("3", "not a number", "BitCoin", "BTC"),
+        ]
+
+        columns = to_columns(responses)
+
+        self.assertEqual(["1", "2", "3"], columns["transaction"])
+        self.assertEqual([Currency.DOGE, None, Currency.BTC], columns["currency"])
+        self.assertEqual([System.DOGECOIN, None, System.BITCOIN], columns["system"])
+        self.assertEqual([3, None, 3], columns["confirmations"])
+        self.assertEqual([Decimal("1.5"), Decimal("0.1"), None], columns["amount"])
+
+    def test_to_columns_selects_columns(self):
+        columns = to_columns(get_transactions(), ["txid", "fee"])
+
+        self.assertEqual(["txid", "fee"], list(columns))
+        self.assertEqual([Decimal("0.001")] * 3, columns["fee"])
+
+        self.assertRaises(KeyError, to_columns, get_transactions(), ["hash"])
+
+    def test_to_columns_rejects_mixed_responses(self):
+        payment = CheckPaymentResponse({"error": False, "message": "Ok", "data": {}})
+
+        self.assertRaises(TypeError, to_columns, [get_transaction("1", "1.0", "BitCoin", "BTC"), payment])
+
+    @skipIf(numpy is None, "numpy is not installed")
+    def test_to_records(self):
+        records = to_records(get_transactions())
+
+        self.assertEqual(3, len(records))
+        self.assertAlmostEqual(4.01, records.amount.sum())
+        self.assertAlmostEqual(4.0, records.amount[records.system == "DOGECOIN"].sum())
+
+    @skipIf(pandas is None, "pandas is not installed")
+    def test_to_dataframe(self):
+        frame = to_dataframe(get_transactions())
+
+        volumes = frame.groupby("system", observed=True)["amount"].sum()
+        self.assertAlmostEqual(4.0, volumes["DOGECOIN"])
+        self.assertAlmostEqual(0.003, frame["fee"].sum())
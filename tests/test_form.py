@@ -0,0 +1,32 @@
+from unittest import TestCase
+from urllib.parse import parse_qs
+
+from paykassa.form import RequestTemplate, encode, encode_fields
+from paykassa.struct import Currency
+
+
+class TestForm(TestCase):
+    def test_encode_fields(self):
+        self.assertEqual("test=true&phone=false&tag=&currency=BTC&comment=a+b%26c",
+                         encode_fields({"test": True, "phone": False, "tag": None, "currency": Currency.BTC,
+                                        "comment": "a b&c"}))
+        self.assertEqual("invoices%5B%5D=1&invoices%5B%5D=2", encode_fields({"invoices[]": ["1", "2"]}))
+
+    def test_template(self):
+        template = RequestTemplate({"func": "sci_create_order", "sci_id": "1", "sci_key": "secret"}, {"phone": False})
+        data = template.fill({"order_id": "42", "phone": False, "test": False})
+
+        self.assertEqual("sci_create_order", data["func"])
+        self.assertEqual({
+            "func": ["sci_create_order"],
+            "sci_id": ["1"],
+            "sci_key": ["secret"],
+            "phone": ["false"],
+            "order_id": ["42"],
+            "test": ["false"],
+        }, parse_qs(encode(data).decode()))
+        self.assertEqual(1, encode(data).count(b"phone"))
+
+        data["sci_key"] = "rotated"
+        self.assertEqual(["rotated"], parse_qs(encode(data).decode())["sci_key"])
+        self.assertNotIn(b"secret", encode(data))
@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+from unittest import TestCase, IsolatedAsyncioTestCase
+
+from paykassa.dto import CheckBalanceRequest
+from paykassa.hedge import HedgePolicy, call_hedged, call_hedged_async
+from paykassa.middleware import Middleware
+from paykassa.payment import PaymentApi
+from tests.test_middleware import StaticTransport
+
+
+class SlowFirstSend(object):
+    def __init__(self, first_delay: float):
+        self.first_delay = first_delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self) -> dict:
+        with self.lock:
+            self.calls += 1
+            call = self.calls
+
+        time.sleep(self.first_delay if call == 1 else 0)
+        return {"error": False, "message": "Ok", "data": {"call": call}}
+
+
+class CapturingMiddleware(Middleware):
+    def __init__(self):
+        self.calls = []
+
+    def handle(self, call, proceed):
+        self.calls.append(call)
+        return proceed(call)
+
+
+class TestHedgePolicy(TestCase):
+    def test_rejects_non_read_only_endpoints(self):
+        for endpoint in ["api_payment", "sci_create_order_get_data", "sci_create_order"]:
+            with self.assertRaises(ValueError):
+                HedgePolicy(endpoints=[endpoint])
+
+        self.assertFalse(HedgePolicy().is_hedged("api_payment"))
+
+    def test_delay_follows_percentile(self):
+        policy = HedgePolicy(percentile=90, initial_delay=0.5, min_delay=0.01)
+
+        self.assertEqual(0.5, policy.get_delay("api_get_shop_balance"))
+
+        for latency in range(1, 11):
+            policy.record("api_get_shop_balance", latency / 100)
+
+        self.assertEqual(0.1, policy.get_delay("api_get_shop_balance"))
+
+    def test_second_request_wins(self):
+        policy = HedgePolicy(initial_delay=0.02, min_delay=0)
+        send = SlowFirstSend(first_delay=0.5)
+
+        started = time.monotonic()
+        response = call_hedged("sci_confirm_transaction_notification", send, policy)
+
+        self.assertEqual(2, response["data"]["call"])
+        self.assertLess(time.monotonic() - started, 0.4)
+        self.assertLess(policy.get_delay("sci_confirm_transaction_notification"), 0.02)
+        policy.close()
+
+    def test_loser_does_not_overwrite_the_call(self):
+        middleware = CapturingMiddleware()
+        transport = StaticTransport(ConnectionError("Connection reset by peer"), failures=1, delay=0.1)
+        client = PaymentApi("1", "test", transport) \
+            .add_middleware(middleware) \
+            .set_hedge_policy(HedgePolicy(initial_delay=0.02))
+
+        self.assertFalse(client.check_balance(CheckBalanceRequest()).has_error())
+        time.sleep(0.15)
+
+        call = middleware.calls[0]
+        self.assertIsNotNone(call.response)
+        self.assertIsNone(call.exception)
+
+        client.close()
+        self.assertIsNone(client._hedge_policy._executor)
+        self.assertIsNone(client._hedge_policy._primary_executor)
+
+    def test_primaries_reuse_pool_threads(self):
+        policy = HedgePolicy(initial_delay=1, max_primary_workers=2)
+        threads = set()
+
+        def send() -> dict:
+            threads.add(threading.current_thread())
+            return {"error": False, "message": "Ok", "data": {}}
+
+        for _ in range(10):
+            call_hedged("api_get_shop_balance", send, policy)
+        policy.close()
+
+        self.assertLessEqual(len(threads), 2)
+        self.assertTrue(all(thread.name.startswith("paykassa-primary") for thread in threads))
+
+    def test_payments_are_never_hedged(self):
+        send = SlowFirstSend(first_delay=0.1)
+
+        response = call_hedged("api_payment", send, HedgePolicy(initial_delay=0.01))
+
+        self.assertEqual(1, response["data"]["call"])
+        self.assertEqual(1, send.calls)
+
+
+class TestHedgeAsync(IsolatedAsyncioTestCase):
+    async def test_loser_is_cancelled(self):
+        cancelled = []
+
+        async def send() -> dict:
+            if not cancelled:
+                cancelled.append(False)
+                try:
+                    await asyncio.sleep(1)
+                except asyncio.CancelledError:
+                    cancelled[0] = True
+                    raise
+            return {"error": False, "message": "Ok", "data": {}}
+
+        response = await call_hedged_async("api_get_shop_txids", send, HedgePolicy(initial_delay=0.02))
+        await asyncio.sleep(0)
+
+        self.assertFalse(response["error"])
+        self.assertEqual([True], cancelled)
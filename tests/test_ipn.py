@@ -0,0 +1,190 @@
+import io
+import threading
+from unittest import TestCase, IsolatedAsyncioTestCase
+
+from paykassa.dto import CheckPaymentRequest, CheckPaymentResponse
+from paykassa.ipn import IpnReceiver, AsyncIpnReceiver
+from paykassa.merchant import MerchantApiInterface
+from tests.test_async_merchant import AsyncMerchantApiMock
+from tests.test_merchant import MerchantApiMock
+
+
+class BlockingMerchantApiMock(MerchantApiMock):
+    def __init__(self, sci_id: str, sci_key: str):
+        super(BlockingMerchantApiMock, self).__init__(sci_id, sci_key)
+        self.release = threading.Event()
+        self.hashes = []
+
+    def _make_request(self, endpoint: str, request: dict) -> dict:
+        self.release.wait(5)
+        self.hashes.append(request["private_hash"])
+        return super(BlockingMerchantApiMock, self)._make_request(endpoint, request)
+
+
+class FlakyMerchantApiStub(MerchantApiInterface):
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.calls = 0
+
+    def check_payment(self, request: CheckPaymentRequest, timeout: float = None) -> CheckPaymentResponse:
+        self.calls += 1
+        if self.calls <= self.failures:
+            return CheckPaymentResponse({"error": True, "message": "Timed out", "data": {}, "error_type": "timeout"})
+
+        return CheckPaymentResponse({"error": False, "message": "Ok", "data": {"transaction": "1"}})
+
+
+def post(receiver: IpnReceiver, body: bytes) -> tuple:
+    statuses = []
+    environ = {
+        "REQUEST_METHOD": "POST",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.input": io.BytesIO(body),
+    }
+
+    chunks = receiver(environ, lambda status, headers: statuses.append(status))
+    return statuses[0], b"".join(chunks)
+
+
+class TestIpnReceiver(TestCase):
+    def setUp(self) -> None:
+        self.client = BlockingMerchantApiMock("1", "test")
+        self.responses = []
+        self.receiver = IpnReceiver(self.client, self.responses.append, workers=2, max_pending=2)
+
+    def tearDown(self) -> None:
+        self.client.release.set()
+        self.receiver.close()
+
+    def test_acks_before_verification(self):
+        self.assertEqual(("200 OK", b"12345|success"), post(self.receiver, b"private_hash=a&order_id=12345"))
+        self.assertEqual([], self.responses)
+
+        self.client.release.set()
+        self.receiver.join()
+
+        self.assertEqual(1, len(self.responses))
+        self.assertEqual("96401", self.responses[0].get_transaction())
+
+    def test_deduplicates_in_flight_hashes(self):
+        for _ in range(5):
+            self.assertEqual("200 OK", post(self.receiver, b"private_hash=a")[0])
+
+        self.client.release.set()
+        self.receiver.join()
+
+        self.assertEqual(["a"], self.client.hashes)
+
+    def test_rejects_when_full(self):
+        statuses = [post(self.receiver, ("private_hash=%d" % i).encode())[0] for i in range(6)]
+
+        self.assertIn("503 Service Unavailable", statuses)
+        self.assertEqual("400 Bad Request", post(self.receiver, b"order_id=1")[0])
+
+    def test_rejects_malformed_content_length(self):
+        statuses = []
+        environ = {"REQUEST_METHOD": "POST", "CONTENT_LENGTH": "abc", "wsgi.input": io.BytesIO(b"private_hash=a")}
+
+        self.receiver(environ, lambda status, headers: statuses.append(status))
+
+        self.assertEqual(["400 Bad Request"], statuses)
+
+    def test_rejects_large_body(self):
+        self.assertEqual("413 Payload Too Large", post(self.receiver, b"private_hash=" + b"a" * 4096)[0])
+        self.assertEqual("200 OK", post(self.receiver, b"private_hash=" + b"a" * 100)[0])
+
+    def test_retries_transient_errors(self):
+        client = FlakyMerchantApiStub(failures=2)
+        responses = []
+        errors = []
+
+        with self.subTest("recovers"):
+            receiver = IpnReceiver(client, responses.append, retry_delay=0.01)
+            receiver.submit("a")
+            receiver.join()
+            receiver.close()
+
+            self.assertEqual(3, client.calls)
+            self.assertEqual(1, len(responses))
+
+        with self.subTest("gives up"):
+            client = FlakyMerchantApiStub(failures=10)
+            receiver = IpnReceiver(client, responses.append, max_attempts=3, retry_delay=0.01) \
+                .set_error_callback(lambda private_hash, response: errors.append(private_hash))
+            receiver.submit("a")
+            receiver.join()
+            receiver.close()
+
+            self.assertEqual(3, client.calls)
+            self.assertEqual(["a"], errors)
+
+
+class TestAsyncIpnReceiver(IsolatedAsyncioTestCase):
+    async def test_verifies_transaction(self):
+        responses = []
+
+        async def callback(response):
+            responses.append(response)
+
+        receiver = AsyncIpnReceiver(AsyncMerchantApiMock("1", "test"), callback, transaction=True)
+        messages = [{"type": "http.request", "body": b"private_hash=", "more_body": True},
+                    {"type": "http.request", "body": b"abc"}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        await receiver({"type": "http", "method": "POST"}, receive, send)
+        await receiver.join()
+        await receiver.close()
+
+        self.assertEqual(200, sent[0]["status"])
+        self.assertEqual(b"OK", sent[1]["body"])
+        self.assertEqual(1, len(responses))
+        self.assertEqual("2431038", responses[0].get_transaction())
+
+    async def test_rejects_large_body(self):
+        receiver = AsyncIpnReceiver(AsyncMerchantApiMock("1", "test"), lambda response: None, max_body_size=16)
+        messages = [{"type": "http.request", "body": b"private_hash=", "more_body": True},
+                    {"type": "http.request", "body": b"a" * 16, "more_body": True}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        await receiver({"type": "http", "method": "POST"}, receive, send)
+
+        self.assertEqual(413, sent[0]["status"])
+        self.assertEqual([], messages)
+
+    async def test_retries_transient_errors(self):
+        stub = FlakyMerchantApiStub(failures=2)
+        responses = []
+
+        class AsyncStub(object):
+            async def check_payment(self, request: CheckPaymentRequest) -> CheckPaymentResponse:
+                return stub.check_payment(request)
+
+        receiver = AsyncIpnReceiver(AsyncStub(), responses.append, retry_delay=0.01)
+        receiver.submit("a")
+        await receiver.join()
+        await receiver.close()
+
+        self.assertEqual(3, stub.calls)
+        self.assertEqual(1, len(responses))
+
+    async def test_close_forgets_pending_hashes(self):
+        receiver = AsyncIpnReceiver(AsyncMerchantApiMock("1", "test"), lambda response: None, workers=0)
+
+        self.assertTrue(receiver.submit("a"))
+        await receiver.close()
+
+        self.assertTrue(receiver.submit("a"))
+        self.assertEqual(1, receiver._queue.qsize())
+        await receiver.close()
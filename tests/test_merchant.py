@@ -159,3 +159,21 @@ class TestMerchantApi(TestCase):
         self.assertEqual("GET", response.get_method())
         self.assertEqual({"hash": "9ef8b443c9c73116e6f363382d3d285610a0314b7c9693901561a472d3934072"}, response.get_params())
 
+    def test_verification_cache(self):
+        class CountingMerchantApiMock(MerchantApiMock):
+            def __init__(self, sci_id: str, sci_key: str):
+                super(CountingMerchantApiMock, self).__init__(sci_id, sci_key)
+                self.calls = []
+
+            def _make_request(self, endpoint: str, request: dict) -> dict:
+                self.calls.append(endpoint)
+                return super(CountingMerchantApiMock, self)._make_request(endpoint, request)
+
+        client = CountingMerchantApiMock("1", "test").set_verification_cache(60)
+
+        for _ in range(3):
+            client.check_payment(CheckPaymentRequest().set_private_hash("hash"))
+            client.check_transaction(CheckTransactionRequest().set_private_hash("hash"))
+
+        self.assertEqual(["sci_confirm_order"] + ["sci_confirm_transaction_notification"] * 3, client.calls)
+
@@ -0,0 +1,120 @@
+import threading
+import time
+from unittest import TestCase, IsolatedAsyncioTestCase
+
+from paykassa.async_payment import AsyncPaymentApi
+from paykassa.dto import CheckBalanceRequest, CheckTransactionRequest
+from paykassa.merchant import MerchantApi
+from paykassa.middleware import Middleware, Call, Pipeline
+from paykassa.payment import PaymentApi
+
+
+class StaticTransport(object):
+    def __init__(self, error: Exception = None, failures: int = None, delay: float = 0.0):
+        self.error = error
+        self.failures = failures
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def post(self, url: str, data: dict, decoder=None) -> dict:
+        with self.lock:
+            self.calls += 1
+            call = self.calls
+
+        if self.error is not None and (self.failures is None or call <= self.failures):
+            time.sleep(self.delay)
+            raise self.error
+        return {"error": False, "message": "Ok", "data": {"func": data.get("func")}}
+
+    def close(self):
+        pass
+
+
+class AsyncStaticTransport(StaticTransport):
+    async def post(self, url: str, data: dict, decoder=None) -> dict:
+        return StaticTransport.post(self, url, data)
+
+
+class RecordingMiddleware(Middleware):
+    def __init__(self, name: str, log: list):
+        self.name = name
+        self.log = log
+        self.calls = []
+
+    def handle(self, call: Call, proceed) -> dict:
+        self.log.append(self.name)
+        try:
+            return proceed(call)
+        finally:
+            self.calls.append(call)
+
+    async def handle_async(self, call: Call, proceed) -> dict:
+        self.log.append(self.name)
+        try:
+            return await proceed(call)
+        finally:
+            self.calls.append(call)
+
+
+class ShortCircuitMiddleware(Middleware):
+    def handle(self, call: Call, proceed) -> dict:
+        return {"error": False, "message": "Cached", "data": {}}
+
+
+class TestPipeline(TestCase):
+    def test_runs_middlewares_in_order(self):
+        log = []
+        pipeline = Pipeline([RecordingMiddleware("outer", log), RecordingMiddleware("inner", log)],
+                            lambda call: log.append("terminal") or {"error": False})
+
+        pipeline.run(Call("api_get_shop_balance", {}, "", "1"))
+
+        self.assertEqual(["outer", "inner", "terminal"], log)
+
+    def test_middleware_sees_call(self):
+        log = []
+        middleware = RecordingMiddleware("recording", log)
+        client = PaymentApi("1", "secret", StaticTransport()).add_middleware(middleware)
+
+        client.check_balance(CheckBalanceRequest().set_shop_id("123"))
+
+        call = middleware.calls[0]
+        self.assertEqual("api_get_shop_balance", call.endpoint)
+        self.assertEqual("123", call.request["shop_id"])
+        self.assertEqual("secret", call.request["api_key"])
+        self.assertEqual("https://paykassa.app/api/0.9/index.php", call.url)
+        self.assertEqual({"func": "api_get_shop_balance"}, call.response["data"])
+        self.assertIsNone(call.exception)
+        self.assertGreaterEqual(call.elapsed, 0)
+
+    def test_middleware_sees_exception(self):
+        middleware = RecordingMiddleware("recording", [])
+        client = MerchantApi("1", "secret", StaticTransport(ConnectionError("Refused"))).add_middleware(middleware)
+
+        response = client.check_transaction(CheckTransactionRequest())
+
+        self.assertTrue(response.has_error())
+        self.assertIsInstance(middleware.calls[0].exception, ConnectionError)
+        self.assertIsNone(middleware.calls[0].response)
+
+    def test_middleware_can_short_circuit(self):
+        transport = StaticTransport()
+        client = PaymentApi("1", "secret", transport).add_middleware(ShortCircuitMiddleware())
+
+        response = client.check_balance(CheckBalanceRequest())
+
+        self.assertEqual("Cached", response.get_message())
+        self.assertEqual(0, transport.calls)
+
+
+class TestAsyncPipeline(IsolatedAsyncioTestCase):
+    async def test_middleware_sees_call(self):
+        middleware = RecordingMiddleware("recording", [])
+        client = AsyncPaymentApi("1", "secret", AsyncStaticTransport()).add_middleware(middleware)
+
+        response = await client.check_balance(CheckBalanceRequest())
+
+        self.assertFalse(response.has_error())
+        self.assertEqual("api_get_shop_balance", middleware.calls[0].endpoint)
+        self.assertEqual({"func": "api_get_shop_balance"}, middleware.calls[0].response["data"])
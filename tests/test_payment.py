@@ -1,8 +1,13 @@
+import threading
+import time
+from decimal import Decimal
 from unittest import TestCase
 
-from paykassa.struct import System, Currency
-from paykassa.dto import CheckBalanceRequest, MakePaymentRequest, GetTxidsOfInvoicesRequest
+from paykassa.struct import System, Currency, ErrorType
+from paykassa.dto import CheckBalanceRequest, MakePaymentRequest, GetTxidsOfInvoicesRequest, MakePaymentResponse
+from paykassa.error import ApiError
 from paykassa.payment import PaymentApi
+from paykassa.transport import get_remaining_time
 
 
 class PaymentApiMock(PaymentApi):
@@ -72,6 +77,20 @@ class TestPaymentApi(TestCase):
         self.assertEqual("6.19148781", response.get_balance(System.BITCOIN, Currency.BTC))
         self.assertEqual("1100300.003423400", response.get_balance(System.BINANCESMARTCHAIN_BEP20, Currency.ADA))
 
+    def test_check_balance_snapshot(self):
+        response = self.client.check_balance(CheckBalanceRequest())
+
+        self.assertEqual(Decimal("6.19148781"), response.get_balance_decimal(System.BITCOIN, Currency.BTC))
+        self.assertEqual(Decimal(0), response.get_balance_decimal(System.ETHEREUM, Currency.ETH))
+        self.assertEqual({
+            (System.BITCOIN, Currency.BTC): Decimal("6.19148781"),
+            (System.TRON_TRC20, Currency.USDT): Decimal(0),
+        }, response.get_balances([(System.BITCOIN, Currency.BTC), (System.TRON_TRC20, Currency.USDT)]))
+        self.assertEqual([
+            (System.BINANCESMARTCHAIN_BEP20, Currency.ADA, Decimal("1100300.003423400")),
+            (System.BITCOIN, Currency.BTC, Decimal("6.19148781")),
+        ], sorted(response.iter_balances(), key=lambda balance: balance[0].name))
+
     def test_make_payment(self):
         response = self.client.make_payment(MakePaymentRequest())
 
@@ -115,3 +134,113 @@ class TestPaymentApi(TestCase):
             context.exception.args[0],
             "The txids of the invoice 4444444444 is not found"
         )
+
+    def test_make_payments(self):
+        class FailingPaymentApiMock(PaymentApiMock):
+            def make_payment(self, request: MakePaymentRequest, timeout: float = None) -> MakePaymentResponse:
+                if request.normalize()["shop_id"] == "2":
+                    raise ValueError("Broken request")
+                return super(FailingPaymentApiMock, self).make_payment(request, timeout)
+
+        client = FailingPaymentApiMock("1", "test")
+        requests = [MakePaymentRequest().set_shop_id(str(i)) for i in range(5)]
+
+        results = list(client.make_payments(requests, concurrency=2))
+
+        self.assertEqual(requests, [request for request, _ in results])
+        self.assertEqual([False, False, True, False, False], [response.has_error() for _, response in results])
+        self.assertEqual("Broken request", results[2][1].get_message())
+
+        unordered = list(client.make_payments(requests, concurrency=3, ordered=False))
+
+        self.assertCountEqual(requests, [request for request, _ in unordered])
+
+    def test_make_payments_rejects_invalid_pair(self):
+        requests = [MakePaymentRequest(), MakePaymentRequest().set_system(System.BITCOIN).set_currency(Currency.ETH)]
+
+        results = list(self.client.make_payments(requests))
+
+        self.assertFalse(results[0][1].has_error())
+        self.assertEqual(ErrorType.VALIDATION, results[1][1].get_error_type())
+        self.assertEqual("ETH is not supported by BITCOIN", results[1][1].get_message())
+
+    def test_check_balance_cache(self):
+        class CountingPaymentApiMock(PaymentApiMock):
+            calls = []
+
+            def _make_request(self, endpoint: str, request: dict) -> dict:
+                self.calls.append(endpoint)
+                return super(CountingPaymentApiMock, self)._make_request(endpoint, request)
+
+        client = CountingPaymentApiMock("1", "test").set_balance_cache_ttl(60)
+
+        client.check_balance(CheckBalanceRequest().set_shop_id("123"))
+        response = client.check_balance(CheckBalanceRequest().set_shop_id("123"))
+
+        self.assertEqual("6.19148781", response.get_balance(System.BITCOIN, Currency.BTC))
+        self.assertEqual(["api_get_shop_balance"], client.calls)
+
+        client.make_payment(MakePaymentRequest().set_shop_id("123"))
+        client.check_balance(CheckBalanceRequest().set_shop_id("123"))
+
+        self.assertEqual(["api_get_shop_balance", "api_payment", "api_get_shop_balance"], client.calls)
+
+    def test_check_balance_cache_follower_timeout(self):
+        release = threading.Event()
+
+        class SlowPaymentApiMock(PaymentApiMock):
+            def _make_request(self, endpoint: str, request: dict) -> dict:
+                release.wait(5)
+                return super(SlowPaymentApiMock, self)._make_request(endpoint, request)
+
+        client = SlowPaymentApiMock("1", "test").set_balance_cache_ttl(60)
+        leader = threading.Thread(target=client.check_balance, args=(CheckBalanceRequest().set_shop_id("123"),))
+        leader.start()
+        time.sleep(0.01)
+
+        response = client.check_balance(CheckBalanceRequest().set_shop_id("123"), timeout=0.05)
+        release.set()
+        leader.join()
+
+        self.assertEqual(ErrorType.TIMEOUT, response.get_error_type())
+
+    def test_get_txids_by_invoices_in_chunks(self):
+        class ChunkedPaymentApiMock(PaymentApi):
+            def __init__(self, api_id: str, api_key: str):
+                super(ChunkedPaymentApiMock, self).__init__(api_id, api_key)
+                self.chunks = []
+
+            def _make_request(self, endpoint: str, request: dict) -> dict:
+                self.chunks.append(request["invoices[]"])
+                if "13" in request["invoices[]"]:
+                    return {"error": True, "message": "Too many requests", "data": {}}
+                return {
+                    "error": False,
+                    "message": "Ok",
+                    "data": {invoice: ["txid" + invoice] for invoice in request["invoices[]"] if invoice != "3"},
+                }
+
+        client = ChunkedPaymentApiMock("1", "test").set_invoices_chunk_size(2, concurrency=2)
+        request = GetTxidsOfInvoicesRequest().set_shop_id("1").set_invoices([str(i) for i in range(5)])
+
+        response = client.get_txids_by_invoices(request)
+
+        self.assertFalse(response.has_error())
+        self.assertEqual(3, len(client.chunks))
+        self.assertEqual(["txid4"], response.get_txids_of_invoice("4"))
+        with self.assertRaises(KeyError):
+            response.get_txids_of_invoice("3")
+
+        self.assertEqual({"0": ["txid0"], "1": ["txid1"], "2": ["txid2"], "4": ["txid4"]},
+                         dict(client.iter_txids_by_invoices(request)))
+
+        failing = GetTxidsOfInvoicesRequest().set_shop_id("1").set_invoices([str(i) for i in range(10, 15)])
+
+        self.assertTrue(client.get_txids_by_invoices(failing).has_error())
+        with self.assertRaises(ApiError):
+            list(client.iter_txids_by_invoices(failing))
+
+        for _ in client.iter_txids_by_invoices(request, timeout=0.01):
+            time.sleep(0.02)
+            self.assertIsNone(get_remaining_time())
+
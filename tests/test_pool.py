@@ -0,0 +1,109 @@
+import os
+import tempfile
+import threading
+from unittest import TestCase
+
+from paykassa.dto import GenerateAddressRequest, GenerateAddressResponse
+from paykassa.merchant import MerchantApiInterface
+from paykassa.pool import AddressPool, FileAddressStore
+from paykassa.struct import System, Currency
+
+
+class MerchantApiStub(MerchantApiInterface):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.invoice_id = 0
+        self.error = False
+        self.keep_raw = True
+
+    def generate_address(self, request: GenerateAddressRequest, timeout: float = None) -> GenerateAddressResponse:
+        if self.error:
+            return GenerateAddressResponse({"error": True, "message": "Unavailable", "data": {}})
+
+        data = request.normalize()
+        with self.lock:
+            self.invoice_id += 1
+            invoice_id = str(self.invoice_id)
+
+        return GenerateAddressResponse({
+            "error": False,
+            "message": "Data has been successfully received.",
+            "data": {
+                "invoice_id": invoice_id,
+                "order_id": "",
+                "wallet": "wallet" + invoice_id,
+                "amount": "0",
+                "system": {"11": "BitCoin", "15": "Dogecoin"}[data["system"]],
+                "currency": data["currency"],
+                "url": "https://crypto.paykassa.pro/sci/index.php?hash=" + invoice_id,
+                "tag": False,
+            },
+        }, keep_raw=self.keep_raw)
+
+
+class TestAddressPool(TestCase):
+    def setUp(self) -> None:
+        self.client = MerchantApiStub()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "addresses.jsonl")
+
+    def create_pool(self, **kwargs) -> AddressPool:
+        pool = AddressPool(self.client, [(System.BITCOIN, Currency.BTC), (System.DOGECOIN, Currency.DOGE)],
+                           low=2, high=4, store=FileAddressStore(self.path), **kwargs)
+        pool.join()
+        return pool
+
+    def test_fills_to_high_watermark(self):
+        with self.create_pool() as pool:
+            self.assertEqual(4, pool.get_size(System.BITCOIN, Currency.BTC))
+            self.assertEqual(4, pool.get_size(System.DOGECOIN, Currency.DOGE))
+
+            taken = [pool.take(System.BITCOIN, Currency.BTC).get_wallet() for _ in range(3)]
+            self.assertEqual(3, len(set(taken)))
+
+            pool.join()
+            self.assertEqual(4, pool.get_size(System.BITCOIN, Currency.BTC))
+            self.assertEqual(11, self.client.invoice_id)
+
+    def test_survives_restart(self):
+        with self.create_pool() as pool:
+            taken = pool.take(System.DOGECOIN, Currency.DOGE)
+
+        with self.create_pool() as pool:
+            self.assertEqual(8, len(pool))
+            self.assertEqual(9, self.client.invoice_id)
+
+            wallets = [pool.take(System.DOGECOIN, Currency.DOGE).get_wallet() for _ in range(3)]
+            self.assertNotIn(taken.get_wallet(), wallets)
+            self.assertIs(System.DOGECOIN, pool.take(System.DOGECOIN, Currency.DOGE).get_system())
+
+    def test_survives_restart_with_compact_responses(self):
+        self.client.keep_raw = False
+
+        with self.create_pool():
+            pass
+
+        with self.create_pool() as pool:
+            self.assertEqual(8, self.client.invoice_id)
+
+            response = pool.take(System.BITCOIN, Currency.BTC)
+            self.assertEqual("wallet" + response.get_invoice_id(), response.get_wallet())
+            self.assertIs(System.BITCOIN, response.get_system())
+
+    def test_falls_back_to_api_when_empty(self):
+        self.client.error = True
+
+        with self.create_pool() as pool:
+            self.assertEqual(0, len(pool))
+            self.client.error = False
+
+            self.assertFalse(pool.take(System.BITCOIN, Currency.BTC).has_error())
+            pool.join()
+            self.assertEqual(4, pool.get_size(System.BITCOIN, Currency.BTC))
+
+    def test_drops_expired_addresses(self):
+        with self.create_pool(max_age=0) as pool:
+            self.assertGreater(int(pool.take(System.BITCOIN, Currency.BTC).get_invoice_id()), 8)
+
+        self.assertRaises(KeyError, pool.take, System.ETHEREUM, Currency.ETH)
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import time
+from unittest import TestCase
+
+from paykassa.dto import CheckBalanceRequest
+from paykassa.error import RateLimitExceeded
+from paykassa.payment import PaymentApi
+from paykassa.ratelimit import RateLimiter, MemoryBucketStore, FileBucketStore
+from paykassa.struct import ErrorType
+from tests.test_middleware import StaticTransport
+
+
+class TestRateLimiter(TestCase):
+    def test_allows_burst_then_waits(self):
+        limiter = RateLimiter(rate=20, burst=2)
+
+        self.assertEqual(0, limiter.try_acquire("1", "api_payment"))
+        self.assertEqual(0, limiter.try_acquire("1", "api_payment"))
+        self.assertGreater(limiter.try_acquire("1", "api_payment"), 0)
+        self.assertEqual(0, limiter.try_acquire("2", "api_payment"))
+
+        started = time.monotonic()
+        limiter.acquire("1", "api_payment")
+
+        self.assertGreater(time.monotonic() - started, 0.02)
+
+    def test_endpoint_buckets(self):
+        limiter = RateLimiter(rate=100, burst=100, endpoint_rates={"api_payment": (1, 1)})
+
+        self.assertEqual(0, limiter.try_acquire("1", "api_payment"))
+        self.assertGreater(limiter.try_acquire("1", "api_payment"), 0)
+        self.assertEqual(0, limiter.try_acquire("1", "api_get_shop_balance"))
+
+    def test_fails_fast_when_not_blocking(self):
+        limiter = RateLimiter(rate=1, burst=1, blocking=False)
+        limiter.acquire("1", "api_payment")
+
+        with self.assertRaises(RateLimitExceeded):
+            limiter.acquire("1", "api_payment")
+
+    def test_file_store_is_shared(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "buckets.json")
+            first = RateLimiter(rate=1, burst=2, store=FileBucketStore(path))
+            second = RateLimiter(rate=1, burst=2, store=FileBucketStore(path))
+
+            self.assertEqual(0, first.try_acquire("1", "api_payment"))
+            self.assertEqual(0, second.try_acquire("1", "api_payment"))
+            self.assertGreater(first.try_acquire("1", "api_payment"), 0)
+
+    def test_client_reports_rate_limit(self):
+        transport = StaticTransport()
+        client = PaymentApi("1", "test", transport) \
+            .set_rate_limiter(RateLimiter(rate=1, burst=1, store=MemoryBucketStore(), blocking=False))
+
+        self.assertFalse(client.check_balance(CheckBalanceRequest()).has_error())
+        response = client.check_balance(CheckBalanceRequest())
+
+        self.assertEqual(ErrorType.RATE_LIMITED, response.get_error_type())
+        self.assertEqual(1, transport.calls)
@@ -0,0 +1,51 @@
+import time
+from unittest import TestCase
+
+from paykassa.merchant import MerchantApi
+from paykassa.registry import ShopRegistry
+from paykassa.simulator import Simulator, fixed_latency
+from paykassa.struct import System, Currency
+
+
+class TestShopRegistry(TestCase):
+    def setUp(self) -> None:
+        self.simulator = Simulator(seed=1).start()
+        self.registry = ShopRegistry(concurrency=8, configure=self.__point_to_simulator)
+
+        for shop_id in range(1, 9):
+            self.registry.add_payment_shop(str(shop_id), shop_id, "key %d" % shop_id)
+            self.simulator.set_balance(str(shop_id), System.BITCOIN, Currency.BTC, str(shop_id))
+
+    def tearDown(self) -> None:
+        self.registry.close()
+        self.simulator.stop()
+
+    def test_check_balances_fans_out(self):
+        self.simulator.set_latency(fixed_latency(0.2))
+
+        started = time.monotonic()
+        balances = self.registry.check_balances()
+        elapsed = time.monotonic() - started
+
+        self.assertEqual([str(shop_id) for shop_id in range(1, 9)], sorted(balances))
+        for shop_id, response in balances.items():
+            self.assertFalse(response.has_error(), response.get_message())
+            self.assertEqual(shop_id + ".00000000", response.get_balance(System.BITCOIN, Currency.BTC))
+        self.assertLess(elapsed, 0.2 * 4)
+
+    def test_routes_credentials(self):
+        self.registry.add_merchant_shop("1", "1", "sci key")
+
+        self.assertEqual(3, self.registry.get_payment_api("3")._api_id)
+        self.assertIsInstance(self.registry.get_merchant_api("1"), MerchantApi)
+        self.assertIs(self.registry.get_payment_api("1")._transport, self.registry.get_merchant_api("1")._transport)
+        self.assertRaises(KeyError, self.registry.get_merchant_api, "2")
+
+        balances = self.registry.check_balances(["2", "5"])
+        self.assertEqual(["2", "5"], sorted(balances))
+
+        self.registry.remove_shop("2")
+        self.assertRaises(KeyError, self.registry.get_payment_api, "2")
+
+    def __point_to_simulator(self, client):
+        client.BASE_URL = self.simulator.get_url() + ("api/" if hasattr(client, "check_balance") else "sci/")
@@ -0,0 +1,92 @@
+import time
+from unittest import TestCase
+
+from paykassa.dto import CheckBalanceRequest, MakePaymentRequest
+from paykassa.error import CircuitOpenError
+from paykassa.payment import PaymentApi
+from paykassa.middleware import Call
+from paykassa.ratelimit import RateLimiter
+from paykassa.retry import RetryPolicy, CircuitBreaker
+from paykassa.struct import ErrorType
+from tests.test_middleware import StaticTransport
+
+
+class TestRetryPolicy(TestCase):
+    def test_delays_grow_exponentially(self):
+        policy = RetryPolicy(attempts=4, base_delay=0.1, max_delay=0.3, jitter=False)
+
+        self.assertEqual([0.1, 0.2, 0.3], list(policy.get_delays("api_get_shop_balance")))
+
+    def test_payments_are_not_retried_by_default(self):
+        self.assertEqual([], list(RetryPolicy().get_delays("api_payment")))
+        self.assertEqual([], list(RetryPolicy().get_delays("sci_create_order")))
+        self.assertEqual(2, len(list(RetryPolicy(retry_payments=True).get_delays("api_payment"))))
+
+    def test_client_retries_idempotent_calls(self):
+        transport = StaticTransport(ConnectionError("Connection reset by peer"), failures=2)
+        client = PaymentApi("1", "test", transport) \
+            .set_retry_policy(RetryPolicy(attempts=3, base_delay=0.001))
+
+        response = client.check_balance(CheckBalanceRequest())
+
+        self.assertFalse(response.has_error())
+        self.assertEqual(3, transport.calls)
+
+    def test_client_does_not_retry_payments(self):
+        transport = StaticTransport(ConnectionError("Connection reset by peer"), failures=1)
+        client = PaymentApi("1", "test", transport) \
+            .set_retry_policy(RetryPolicy(attempts=3, base_delay=0.001))
+
+        response = client.make_payment(MakePaymentRequest())
+
+        self.assertTrue(response.has_error())
+        self.assertEqual(ErrorType.TRANSPORT, response.get_error_type())
+        self.assertEqual(1, transport.calls)
+
+
+class TestCircuitBreaker(TestCase):
+    def test_opens_after_failures(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+        transport = StaticTransport(ConnectionError("Connection reset by peer"), failures=2)
+        send = lambda: breaker.handle(Call("api_get_shop_balance", {}, "", "1"), lambda call: transport.post("", {}))
+
+        for _ in range(2):
+            with self.assertRaises(ConnectionError):
+                send()
+
+        with self.assertRaises(CircuitOpenError):
+            send()
+
+        self.assertEqual(CircuitBreaker.OPEN, breaker.get_state("api_get_shop_balance"))
+        self.assertEqual(CircuitBreaker.CLOSED, breaker.get_state("api_get_shop_txids"))
+        self.assertEqual(2, transport.calls)
+
+        time.sleep(0.06)
+
+        self.assertFalse(send()["error"])
+        self.assertEqual(CircuitBreaker.CLOSED, breaker.get_state("api_get_shop_balance"))
+
+    def test_client_reports_open_circuit(self):
+        transport = StaticTransport(ConnectionError("Connection reset by peer"), failures=10)
+        client = PaymentApi("1", "test", transport) \
+            .set_circuit_breaker(CircuitBreaker(failure_threshold=1))
+
+        client.check_balance(CheckBalanceRequest())
+        response = client.check_balance(CheckBalanceRequest())
+
+        self.assertEqual(ErrorType.CIRCUIT_OPEN, response.get_error_type())
+
+    def test_rate_limited_probe_releases_half_open_circuit(self):
+        transport = StaticTransport(ConnectionError("Connection reset by peer"), failures=1)
+        client = PaymentApi("1", "test", transport) \
+            .set_circuit_breaker(CircuitBreaker(failure_threshold=1, reset_timeout=0.05)) \
+            .set_rate_limiter(RateLimiter(rate=10, burst=1, blocking=False))
+
+        self.assertEqual(ErrorType.TRANSPORT, client.check_balance(CheckBalanceRequest()).get_error_type())
+        time.sleep(0.06)
+
+        self.assertEqual(ErrorType.RATE_LIMITED, client.check_balance(CheckBalanceRequest()).get_error_type())
+        time.sleep(0.06)
+
+        self.assertFalse(client.check_balance(CheckBalanceRequest()).has_error())
+        self.assertEqual(CircuitBreaker.CLOSED, client._circuit_breaker.get_state("api_get_shop_balance"))
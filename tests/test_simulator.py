@@ -0,0 +1,112 @@
+from decimal import Decimal
+from unittest import TestCase
+
+from paykassa.dto import GenerateAddressRequest, CheckTransactionRequest, CheckPaymentRequest, CheckBalanceRequest, \
+    MakePaymentRequest, GetTxidsOfInvoicesRequest
+from paykassa.merchant import MerchantApi
+from paykassa.payment import PaymentApi
+from paykassa.simulator import Simulator, fixed_latency
+from paykassa.struct import System, Currency, CommissionPayer, TransactionPriority, ErrorType
+
+
+class TestSimulator(TestCase):
+    def setUp(self) -> None:
+        self.simulator = Simulator(seed=1, confirm_after=60.0, block_time=0.0).start()
+
+        self.merchant = MerchantApi("123", "secret")
+        self.merchant.BASE_URL = self.simulator.get_url() + "sci/"
+        self.payment = PaymentApi(123, "secret")
+        self.payment.BASE_URL = self.simulator.get_url() + "api/"
+
+    def tearDown(self) -> None:
+        self.merchant.close()
+        self.payment.close()
+        self.simulator.stop()
+
+    def test_deposit_confirms_and_credits_balance(self):
+        response = self.merchant.generate_address(self.__get_address_request())
+        self.assertFalse(response.has_error(), response.get_message())
+
+        private_hash = self.simulator.get_private_hash(response.get_invoice_id())
+        transaction = self.merchant.check_transaction(CheckTransactionRequest().set_private_hash(private_hash))
+        self.assertTrue(transaction.has_error())
+
+        self.simulator.pay(response.get_invoice_id())
+
+        transaction = self.merchant.check_transaction(CheckTransactionRequest().set_private_hash(private_hash))
+        self.assertFalse(transaction.has_error(), transaction.get_message())
+        self.assertEqual("yes", transaction.get_status())
+        self.assertEqual(System.BITCOIN, transaction.get_system())
+
+        payment = self.merchant.check_payment(CheckPaymentRequest().set_private_hash(private_hash))
+        self.assertFalse(payment.has_error(), payment.get_message())
+        self.assertEqual("1.50000000", payment.get_amount())
+
+        balance = self.payment.check_balance(CheckBalanceRequest().set_shop_id("123"))
+        self.assertEqual("1.50000000", balance.get_balance(System.BITCOIN, Currency.BTC))
+
+        txids = self.payment.get_txids_by_invoices(GetTxidsOfInvoicesRequest()
+                                                   .set_shop_id("123")
+                                                   .set_invoices([response.get_invoice_id()]))
+        self.assertEqual([transaction.get_txid()], txids.get_txids_of_invoice(response.get_invoice_id()))
+
+    def test_balance_credits_only_due_invoices(self):
+        invoice_ids = [self.merchant.generate_address(self.__get_address_request()).get_invoice_id()
+                       for _ in range(3)]
+        self.simulator.pay(invoice_ids[1])
+
+        balance = self.payment.check_balance(CheckBalanceRequest().set_shop_id("123"))
+        self.assertEqual("1.50000000", balance.get_balance(System.BITCOIN, Currency.BTC))
+
+        self.simulator.pay(invoice_ids[0]).pay(invoice_ids[1])
+
+        balance = self.payment.check_balance(CheckBalanceRequest().set_shop_id("123"))
+        self.assertEqual("3.00000000", balance.get_balance(System.BITCOIN, Currency.BTC))
+
+    def test_payout_debits_balance(self):
+        self.simulator.set_balance("123", System.BITCOIN, Currency.BTC, "1.0")
+
+        response = self.payment.make_payment(self.__get_payment_request("0.5"))
+        self.assertFalse(response.has_error(), response.get_message())
+        self.assertEqual(Decimal("0.4975"), self.simulator.get_balance("123", System.BITCOIN, Currency.BTC))
+
+        response = self.payment.make_payment(self.__get_payment_request("0.5"))
+        self.assertTrue(response.has_error())
+        self.assertEqual("Insufficient funds", response.get_message())
+
+    def test_fault_injection(self):
+        self.simulator.set_throttle_rate(1.0, "api_get_shop_balance")
+        response = self.payment.check_balance(CheckBalanceRequest().set_shop_id("123"))
+        self.assertEqual("Too many requests", response.get_message())
+
+        self.simulator.set_throttle_rate(0.0, "api_get_shop_balance").set_error_rate(1.0)
+        response = self.payment.check_balance(CheckBalanceRequest().set_shop_id("123"))
+        self.assertEqual(ErrorType.TRANSPORT, response.get_error_type())
+
+        self.simulator.set_error_rate(0.0).set_latency(fixed_latency(0.5))
+        response = self.payment.check_balance(CheckBalanceRequest().set_shop_id("123"), timeout=0.1)
+        self.assertTrue(response.is_timeout())
+
+        self.simulator.set_latency(None).set_drip(4, 0.05)
+        response = self.payment.check_balance(CheckBalanceRequest().set_shop_id("123"), timeout=0.2)
+        self.assertTrue(response.is_timeout())
+
+    @staticmethod
+    def __get_address_request() -> GenerateAddressRequest:
+        return GenerateAddressRequest() \
+            .set_order_id("order 1") \
+            .set_amount("1.5") \
+            .set_currency(Currency.BTC) \
+            .set_system(System.BITCOIN) \
+            .set_paid_commission(CommissionPayer.SHOP)
+
+    @staticmethod
+    def __get_payment_request(amount: str) -> MakePaymentRequest:
+        return MakePaymentRequest() \
+            .set_shop_id("123") \
+            .set_amount(amount) \
+            .set_currency(Currency.BTC) \
+            .set_system(System.BITCOIN) \
+            .set_paid_commission(CommissionPayer.SHOP) \
+            .set_number("3LaKdUrPfVyZeEVYpZei3HwjqQj5AHHTCE") \
+            .set_priority(TransactionPriority.MEDIUM)
@@ -0,0 +1,106 @@
+import threading
+import time
+from unittest import TestCase
+
+from paykassa.dto import GetTxidsOfInvoicesRequest, GetTxidsOfInvoicesResponse
+from paykassa.payment import PaymentApiInterface
+from paykassa.tracker import TxidTracker
+
+
+class PaymentApiStub(PaymentApiInterface):
+    def __init__(self):
+        self.txids = {}
+        self.requested = []
+        self.error = False
+        self.exception = None
+
+    def get_txids_by_invoices(self, request: GetTxidsOfInvoicesRequest) -> GetTxidsOfInvoicesResponse:
+        invoices = request.normalize()["invoices[]"]
+        self.requested.append(sorted(invoices))
+
+        if self.exception is not None:
+            raise self.exception
+        if self.error:
+            return GetTxidsOfInvoicesResponse({"error": True, "message": "Unavailable", "data": {}})
+
+        return GetTxidsOfInvoicesResponse({
+            "error": False,
+            "message": "Ok",
+            "data": {invoice: self.txids[invoice] for invoice in invoices if invoice in self.txids},
+        })
+
+
+class TestTxidTracker(TestCase):
+    def setUp(self) -> None:
+        self.client = PaymentApiStub()
+        self.tracker = TxidTracker(self.client, "1", interval=0.05, max_interval=0.1)
+
+    def test_polls_only_pending_invoices(self):
+        self.tracker.add(["1", "2", "3"])
+        self.client.txids["2"] = ["txid2"]
+
+        self.assertEqual([("2", ["txid2"])], self.tracker.poll())
+        self.assertCountEqual(["1", "3"], self.tracker.get_pending())
+
+        self.client.txids["1"] = ["txid1"]
+        time.sleep(0.06)
+
+        self.assertEqual([("1", ["txid1"])], self.tracker.poll())
+        self.assertEqual([["1", "2", "3"], ["1", "3"]], self.client.requested)
+
+    def test_backs_off_unresolved_invoices(self):
+        self.tracker.add(["1"])
+
+        self.assertEqual([], self.tracker.poll())
+        self.assertEqual([], self.tracker.poll())
+        self.assertEqual(1, len(self.client.requested))
+
+        first_delay = self.tracker.get_next_poll_time() - time.monotonic()
+        time.sleep(0.06)
+        self.tracker.poll()
+        second_delay = self.tracker.get_next_poll_time() - time.monotonic()
+
+        self.assertLess(first_delay, second_delay)
+
+    def test_keeps_invoices_on_error(self):
+        self.tracker.add(["1"])
+        self.client.error = True
+
+        with self.assertLogs("paykassa.tracker", "WARNING"):
+            self.assertEqual([], self.tracker.poll())
+
+        self.assertEqual(["1"], self.tracker.get_pending())
+        self.assertIsNotNone(self.tracker.get_next_poll_time())
+
+        self.client.error = False
+        self.client.exception = ConnectionError("Connection reset")
+        time.sleep(0.06)
+
+        with self.assertLogs("paykassa.tracker", "ERROR"):
+            self.assertEqual([], self.tracker.poll())
+
+        self.assertEqual(["1"], self.tracker.get_pending())
+        self.assertIsNotNone(self.tracker.get_next_poll_time())
+
+    def test_watch_survives_errors(self):
+        self.tracker.add(["1"])
+        self.client.exception = ConnectionError("Connection reset")
+
+        self.client.txids["1"] = ["txid1"]
+        threading.Timer(0.02, lambda: setattr(self.client, "exception", None)).start()
+
+        with self.assertLogs("paykassa.tracker", "ERROR"):
+            self.assertEqual(("1", ["txid1"]), next(self.tracker.watch()))
+
+        self.assertEqual(2, len(self.client.requested))
+
+    def test_watch_emits_resolutions(self):
+        resolved = []
+        self.tracker.add(["1"])
+        self.client.txids["1"] = ["txid1"]
+
+        events = self.tracker.watch(callback=lambda invoice_id, txids: resolved.append(invoice_id))
+
+        self.assertEqual(("1", ["txid1"]), next(events))
+        self.assertEqual(["1"], resolved)
+        self.assertEqual(0, len(self.tracker))
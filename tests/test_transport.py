@@ -0,0 +1,193 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import TestCase, IsolatedAsyncioTestCase, skipIf
+
+from paykassa.async_transport import AsyncTransport, aiohttp
+from paykassa.decoder import set_decoder, stdlib_decoder
+from paykassa.dto import CheckBalanceRequest
+from paykassa.error import RequestTimeout
+from paykassa.payment import PaymentApi
+from paykassa.struct import ErrorType
+from paykassa.transport import Transport, deadline
+
+
+class EchoPortHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = json.dumps({
+            "error": False,
+            "message": "Ok",
+            "data": {"port": self.client_address[1]},
+        }).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SlowDripHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        # takes about 5 seconds to send in full
+        body = json.dumps({"error": False, "message": "Ok" + " " * 200, "data": {}}).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        try:
+            for byte in body:
+                self.wfile.write(bytes([byte]))
+                self.wfile.flush()
+                time.sleep(0.02)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(handler) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def stop_server(server: ThreadingHTTPServer):
+    server.shutdown()
+    server.server_close()
+
+
+class TestTransport(TestCase):
+    def setUp(self) -> None:
+        self.server = start_server(EchoPortHandler)
+        self.url = "http://127.0.0.1:%d/" % self.server.server_address[1]
+
+    def tearDown(self) -> None:
+        stop_server(self.server)
+
+    def test_reuses_connection(self):
+        with Transport() as transport:
+            first = transport.post(self.url, {"func": "test"})
+            second = transport.post(self.url, {"func": "test"})
+
+        self.assertEqual(first["data"]["port"], second["data"]["port"])
+
+    def test_evicts_idle_connection(self):
+        with Transport(idle_timeout=0) as transport:
+            first = transport.post(self.url, {"func": "test"})
+            second = transport.post(self.url, {"func": "test"})
+
+        self.assertNotEqual(first["data"]["port"], second["data"]["port"])
+
+    def test_client_uses_transport(self):
+        class LocalPaymentApi(PaymentApi):
+            BASE_URL = self.url
+
+        with LocalPaymentApi("1", "test") as client:
+            response = client.check_balance(CheckBalanceRequest())
+
+        self.assertFalse(response.has_error())
+        self.assertEqual("Ok", response.get_message())
+
+    def test_shared_transport_is_not_closed_by_client(self):
+        transport = Transport()
+
+        with PaymentApi("1", "test", transport):
+            pass
+
+        self.assertEqual("Ok", transport.post(self.url, {"func": "test"})["message"])
+        transport.close()
+
+    def test_decoder(self):
+        bodies = []
+
+        def decoder(body: bytes) -> dict:
+            bodies.append(body)
+            return stdlib_decoder(body)
+
+        class LocalPaymentApi(PaymentApi):
+            BASE_URL = self.url
+
+        with LocalPaymentApi("1", "test") as client:
+            self.assertFalse(client.set_decoder(decoder).check_balance(CheckBalanceRequest()).has_error())
+
+            set_decoder(lambda body: {"error": True, "message": "global", "data": {}})
+            try:
+                self.assertEqual(1, len(bodies))
+                self.assertIsInstance(bodies[0], bytes)
+                self.assertFalse(client.check_balance(CheckBalanceRequest()).has_error())
+                self.assertEqual("global", client.set_decoder(None).check_balance(CheckBalanceRequest()).get_message())
+            finally:
+                set_decoder(None)
+
+
+class TestTransportTimeouts(TestCase):
+    def setUp(self) -> None:
+        self.server = start_server(SlowDripHandler)
+        self.url = "http://127.0.0.1:%d/" % self.server.server_address[1]
+
+    def tearDown(self) -> None:
+        stop_server(self.server)
+
+    def test_deadline_bounds_slow_body(self):
+        with Transport(read_timeout=1) as transport:
+            started = time.monotonic()
+            with self.assertRaises(RequestTimeout):
+                with deadline(0.2):
+                    transport.post(self.url, {"func": "test"})
+
+        self.assertAlmostEqual(0.2, time.monotonic() - started, delta=0.15)
+
+    def test_client_reports_timeout(self):
+        class LocalPaymentApi(PaymentApi):
+            BASE_URL = self.url
+
+        with LocalPaymentApi("1", "test") as client:
+            response = client.check_balance(CheckBalanceRequest(), timeout=0.2)
+
+        self.assertTrue(response.has_error())
+        self.assertTrue(response.is_timeout())
+        self.assertEqual(ErrorType.TIMEOUT, response.get_error_type())
+
+
+@skipIf(aiohttp is None, "aiohttp is not installed")
+class TestAsyncTransport(IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.server = start_server(EchoPortHandler)
+        self.url = "http://127.0.0.1:%d/" % self.server.server_address[1]
+
+    def tearDown(self) -> None:
+        stop_server(self.server)
+
+    async def test_reuses_connection(self):
+        async with AsyncTransport() as transport:
+            first = await transport.post(self.url, {"func": "test", "invoices[]": ["1", "2"]})
+            second = await transport.post(self.url, {"func": "test", "invoices[]": ["1", "2"]})
+
+        self.assertEqual(first["data"]["port"], second["data"]["port"])
+
+    async def test_deadline(self):
+        server = start_server(SlowDripHandler)
+        url = "http://127.0.0.1:%d/" % server.server_address[1]
+
+        try:
+            async with AsyncTransport() as transport:
+                with self.assertRaises(RequestTimeout):
+                    with deadline(0.2):
+                        await transport.post(url, {"func": "test"})
+        finally:
+            stop_server(server)
+
@@ -0,0 +1,100 @@
+import time
+from unittest import TestCase
+
+from paykassa.dto import CheckTransactionRequest, CheckTransactionResponse
+from paykassa.merchant import MerchantApiInterface
+from paykassa.struct import System
+from paykassa.watcher import ConfirmationWatcher
+
+
+class MerchantApiStub(MerchantApiInterface):
+    def __init__(self):
+        self.confirmations = {}
+        self.requested = []
+        self.error = False
+
+    def check_transaction(self, request: CheckTransactionRequest, timeout: float = None) -> CheckTransactionResponse:
+        private_hash = request.normalize()["private_hash"]
+        self.requested.append(private_hash)
+
+        if self.error:
+            return CheckTransactionResponse({"error": True, "message": "Unavailable", "data": {}})
+
+        confirmations = self.confirmations[private_hash]
+        if confirmations is None:
+            return CheckTransactionResponse({"error": False, "message": "Ok", "data": {"status": "no"}})
+
+        return CheckTransactionResponse({
+            "error": False,
+            "message": "Ok",
+            "data": {
+                "transaction": private_hash,
+                "system": "BitCoin",
+                "confirmations": str(confirmations),
+                "required_confirmations": "3",
+                "status": "yes" if confirmations >= 3 else "no",
+            },
+        })
+
+
+class TestConfirmationWatcher(TestCase):
+    def setUp(self) -> None:
+        self.client = MerchantApiStub()
+        self.watcher = ConfirmationWatcher(self.client, concurrency=4, block_times={System.BITCOIN: 0.1},
+                                           min_interval=0, error_interval=0.05)
+
+    def test_schedules_from_confirmations(self):
+        self.client.confirmations.update({"a": 0, "b": 2})
+        self.watcher.add(["a", "b"])
+
+        self.assertCountEqual(["a", "b"], [private_hash for private_hash, _ in self.watcher.poll()])
+        self.assertEqual([], self.watcher.poll())
+
+        next_poll_time = self.watcher.get_next_poll_time() - time.monotonic()
+        self.assertAlmostEqual(0.05, next_poll_time, delta=0.02)
+
+        self.client.confirmations["b"] = 3
+        time.sleep(0.06)
+
+        events = self.watcher.poll()
+        self.assertEqual(["b"], [private_hash for private_hash, _ in events])
+        self.assertEqual("yes", events[0][1].get_status())
+        self.assertEqual(["a"], self.watcher.get_pending())
+
+        self.assertGreater(self.watcher.get_next_poll_time() - time.monotonic(), 0.15)
+
+    def test_emits_only_changes(self):
+        self.client.confirmations["a"] = 1
+        self.watcher.add(["a"])
+        self.watcher.poll()
+
+        self.assertEqual(0.05, self.watcher.get_delay(System.BITCOIN, 1, 3, False))
+        time.sleep(0.16)
+
+        self.assertEqual([], self.watcher.poll())
+        self.assertEqual(["a", "a"], self.client.requested)
+
+    def test_backs_off_errors(self):
+        self.client.error = True
+        self.watcher.add(["a"])
+
+        self.assertEqual([], self.watcher.poll())
+        self.assertEqual(["a"], self.watcher.get_pending())
+
+        self.watcher.discard("a")
+        self.assertIsNone(self.watcher.get_next_poll_time())
+
+    def test_reschedules_malformed_responses(self):
+        self.client.confirmations.update({"a": None, "b": 1, "c": None})
+        self.watcher.add(["a", "b", "c"])
+
+        with self.assertLogs("paykassa.watcher", "WARNING"):
+            self.assertEqual(["b"], [private_hash for private_hash, _ in self.watcher.poll()])
+
+        self.assertCountEqual(["a", "b", "c"], self.watcher.get_pending())
+
+        self.client.confirmations.update({"a": 3, "c": 3})
+        time.sleep(0.06)
+
+        self.assertCountEqual(["a", "c"], [private_hash for private_hash, _ in self.watcher.poll()])
+        self.assertEqual(["b"], self.watcher.get_pending())